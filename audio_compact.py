@@ -0,0 +1,151 @@
+import hashlib
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from tool_tracing import span
+
+# "flac", "opus", or "none" to upload recordings as they are
+COMPACT_FORMAT = os.environ.get("SCRIPTY_AUDIO_COMPACT", "flac").lower()
+# Speech recognition models work at 16 kHz; anything above is wasted upload
+TARGET_SAMPLERATE = int(os.environ.get("SCRIPTY_AUDIO_SAMPLERATE", "16000"))
+BLOCK_FRAMES = 64 * 1024
+# Compacted copies live here until their upload succeeds, so a retried or
+# resumed upload sends the same bytes without encoding again
+COMPACT_DIR = Path(os.environ.get("SCRIPTY_AUDIO_COMPACT_DIR", str(Path(tempfile.gettempdir()) / "scripty_compact")))
+
+# (container, subtype, suffix) per output format; Opus only supports 8/12/16/24/48 kHz
+FORMATS = {
+    "flac": ("FLAC", "PCM_16", ".flac"),
+    "opus": ("OGG", "OPUS", ".opus"),
+}
+# Inputs worth compacting: uncompressed or losslessly compressed audio
+LOSSLESS_FORMATS = {"WAV", "WAVEX", "RF64", "W64", "AIFF", "CAF", "FLAC"}
+
+
+class Resampler:
+    """
+    Streaming polyphase resampler: a Kaiser-windowed sinc low-pass evaluated
+    only at the output sample positions. Blocks can be any size; output is
+    aligned with the input (no filter delay) and flush() emits the tail.
+    """
+
+    def __init__(self, in_rate, out_rate, taps_per_phase=48):
+        divisor = math.gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.taps = taps_per_phase
+        length = self.up * taps_per_phase
+        # Cut off a little below the lower Nyquist frequency, in upsampled units
+        cutoff = 0.9 / (2 * max(self.up, self.down))
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0) * self.up
+        # phases[p, k] = prototype[p + k * up]
+        self.phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self.offset = (length - 1) // 2
+        # Input history, starting at absolute input index self.start; zero-padded before sample 0
+        self.history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self.start = -(taps_per_phase - 1)
+        self.produced = 0
+        self.consumed = 0
+
+    def _emit(self, last_output):
+        n = np.arange(self.produced, last_output + 1, dtype=np.int64)
+        if not len(n):
+            return np.zeros(0, dtype=np.float32)
+        position = n * self.down + self.offset
+        base = position // self.up
+        index = base[:, None] - np.arange(self.taps)[None, :] - self.start
+        out = np.einsum("ij,ij->i", self.history[index], self.phases[position % self.up])
+        self.produced = last_output + 1
+        # Keep only what the next output still needs
+        keep_from = (self.produced * self.down + self.offset) // self.up - (self.taps - 1)
+        if keep_from > self.start:
+            self.history = self.history[keep_from - self.start:]
+            self.start = keep_from
+        return out
+
+    def process(self, block):
+        block = np.asarray(block, dtype=np.float32)
+        self.history = np.concatenate([self.history, block])
+        self.consumed += len(block)
+        end = self.start + len(self.history) - 1
+        # Last output whose newest tap is already in the history
+        return self._emit(((end + 1) * self.up - 1 - self.offset) // self.down)
+
+    def flush(self):
+        total = -(-self.consumed * self.up // self.down)
+        self.history = np.concatenate([self.history, np.zeros(self.taps, dtype=np.float32)])
+        return self._emit(total - 1)
+
+
+def should_compact(path):
+    """Whether `path` is audio soundfile can read and isn't already compressed"""
+    try:
+        info = sf.info(str(path))
+    except Exception:
+        return False
+    return info.format in LOSSLESS_FORMATS
+
+
+def compact(path, output, format=None, samplerate=None, start=0, stop=None):
+    """
+    Downmix to mono, resample to `samplerate` and encode as FLAC or Opus,
+    reading and writing in blocks so memory doesn't grow with the recording.
+    `start` and `stop` (source frames) compact just part of the file.
+    """
+    format = (format or COMPACT_FORMAT).lower()
+    samplerate = samplerate or TARGET_SAMPLERATE
+    if format not in FORMATS:
+        raise ValueError(f"Unknown compact format: {format}")
+    container, subtype, _ = FORMATS[format]
+
+    with span("audio.compact", format=format, bytes=os.path.getsize(path)) as current, \
+            sf.SoundFile(str(path)) as source:
+        resampler = Resampler(source.samplerate, samplerate) if source.samplerate != samplerate else None
+        with sf.SoundFile(str(output), "w", samplerate=samplerate, channels=1,
+                          format=container, subtype=subtype) as target:
+            source.seek(start)
+            frames = -1 if stop is None else stop - start
+            for block in source.blocks(BLOCK_FRAMES, frames=frames, dtype="float32", always_2d=True):
+                mono = block.mean(axis=1)
+                if resampler is not None:
+                    mono = resampler.process(mono)
+                target.write(np.clip(mono, -1.0, 1.0))
+            if resampler is not None:
+                target.write(np.clip(resampler.flush(), -1.0, 1.0))
+        current.set_attribute("compact_bytes", os.path.getsize(output))
+    return Path(output)
+
+
+def compacted_path(path, format=None):
+    """Where the compacted copy of `path` goes; changes when the source file does"""
+    format = (format or COMPACT_FORMAT).lower()
+    stat = os.stat(path)
+    identity = f"{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{TARGET_SAMPLERATE}"
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+    return COMPACT_DIR / f"{Path(path).stem}_{digest}{FORMATS[format][2]}"
+
+
+def compact_for_upload(path, format=None):
+    """
+    The file to upload for `path`: a compacted copy when that is smaller,
+    otherwise `path` itself. An existing copy from an earlier attempt is reused.
+    """
+    format = (format or COMPACT_FORMAT).lower()
+    if format == "none" or not should_compact(path):
+        return Path(path)
+    output = compacted_path(path, format)
+    if not output.exists():
+        output.parent.mkdir(parents=True, exist_ok=True)
+        partial = output.with_name(output.name + ".part")
+        compact(path, partial, format)
+        os.replace(partial, output)
+    if output.stat().st_size >= os.path.getsize(path):
+        output.unlink()
+        return Path(path)
+    return output
@@ -43,6 +43,9 @@ class AudioRecorder:
         with open(background_script, 'w') as f:
             f.write('''
 import sys
+import shutil
+import threading
+from collections import deque
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
@@ -51,12 +54,131 @@ from datetime import datetime
 from pathlib import Path
 import os
 
+SAMPLERATE = 44100
+# A stream this far behind the other (a stalled device) is treated as silent;
+# one that hasn't delivered anything by then is left out of the recording
+MAX_LAG_FRAMES = SAMPLERATE * 10
+# Mixed samples louder than this are eased towards full scale instead of clipping
+LIMIT_THRESHOLD = 0.9
+
+def limit(samples):
+    """
+    Soft limiter, sample by sample: the same level in, the same level out at
+    any point of the recording, so nothing later depends on what came before
+    """
+    magnitude = np.abs(samples)
+    if not (magnitude > LIMIT_THRESHOLD).any():
+        return samples
+    headroom = 1.0 - LIMIT_THRESHOLD
+    eased = LIMIT_THRESHOLD + headroom * np.tanh((magnitude - LIMIT_THRESHOLD) / headroom)
+    return np.sign(samples) * np.where(magnitude > LIMIT_THRESHOLD, eased, magnitude)
+
+class Track:
+    """One input stream: blocks from its callback, waiting to be mixed"""
+
+    def __init__(self, gain):
+        self.gain = gain
+        # deque append/popleft are atomic, so the audio callback never waits on a lock
+        self.blocks = deque()
+        self.pending = []
+        self.pending_frames = 0
+        self.frames = 0
+
+    def put(self, block):
+        self.blocks.append(block)
+
+    def collect(self):
+        while self.blocks:
+            block = self.blocks.popleft()
+            self.pending.append(block)
+            self.pending_frames += len(block)
+            self.frames += len(block)
+
+    def pad(self, frames, channels):
+        self.pending.append(np.zeros((frames, channels), dtype=np.float32))
+        self.pending_frames += frames
+
+    def take(self, frames):
+        data = np.concatenate(self.pending) if len(self.pending) > 1 else self.pending[0]
+        self.pending = [data[frames:]] if len(data) > frames else []
+        self.pending_frames = len(data) - frames
+        return data[:frames]
+
+    def amplify(self, block):
+        # One gain for the whole session; limit() catches what it pushes too far
+        return block * self.gain
+
+class Mixer:
+    """
+    Mixes system and mic audio as it arrives, on its own thread, straight
+    into the output WAV. Stopping only has to mix what is still queued and
+    close the file, however long the recording ran.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.system = Track(gain=1.5)  # Increase system audio
+        self.mic = Track(gain=1.0)     # Keep mic at normal level
+        # The only stream delivering audio, once the other is known to be silent
+        self.solo = None
+        self.file = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self, block):
+        if self.file is None:
+            self.file = sf.SoundFile(str(self.path), mode='w', samplerate=SAMPLERATE, channels=block.shape[1])
+        self.file.write(block)
+
+    def mix_available(self, final=False):
+        self.system.collect()
+        self.mic.collect()
+        behind, ahead = sorted((self.system, self.mic), key=lambda track: track.pending_frames)
+        if self.solo is None and not behind.frames and (final or ahead.pending_frames > MAX_LAG_FRAMES):
+            # Only one stream delivered audio: save it as recorded
+            self.solo = ahead
+        if self.solo is not None:
+            # A stream that only starts now is ignored rather than mixed in late
+            for track in (self.system, self.mic):
+                if track.pending_frames:
+                    block = track.take(track.pending_frames)
+                    if track is self.solo:
+                        self.write(block)
+            return
+        if ahead.pending_frames - behind.pending_frames > MAX_LAG_FRAMES:
+            behind.pad(ahead.pending_frames - behind.pending_frames - MAX_LAG_FRAMES, ahead.pending[0].shape[1])
+        frames = behind.pending_frames
+        if not frames:
+            return
+        mixed = self.system.amplify(self.system.take(frames)) + self.mic.amplify(self.mic.take(frames))
+        # Prevent clipping
+        self.write(limit(mixed))
+
+    def run(self):
+        while not self.done.is_set():
+            try:
+                self.mix_available()
+            except Exception as e:
+                # Keep draining the queues; close() tries the rest again
+                print(f"Mixing error: {e}")
+            self.done.wait(0.05)
+
+    def close(self):
+        """Mix the last queued blocks and finish the file; returns whether anything was recorded"""
+        self.done.set()
+        self.thread.join()
+        self.mix_available(final=True)
+        if self.file is None:
+            return False
+        # Closing writes the final sizes into the WAV header
+        self.file.close()
+        return True
+
 class AudioRecorder:
     def __init__(self):
         self.system_device = self._get_stereo_mix()
         self.mic_device = self._get_microphone()
-        self.recording_system = []
-        self.recording_mic = []
         self.start_time = time.time()
         
     def _get_stereo_mix(self):
@@ -78,73 +200,42 @@ class AudioRecorder:
     def system_callback(self, indata, frames, time, status):
         if status:
             print(f'System Error: {status}')
-        self.recording_system.append(indata.copy())
+        self.mixer.system.put(indata.copy())
 
     def mic_callback(self, indata, frames, time, status):
         if status:
             print(f'Mic Error: {status}')
-        self.recording_mic.append(indata.copy())
+        self.mixer.mic.put(indata.copy())
 
     def background_record(self):
+        save_dir = Path.home() / "audio_recordings"
+        save_dir.mkdir(exist_ok=True)
+        # Written next to the recordings and moved in when finished, so an
+        # unfinished file is never picked up as the latest recording
+        partial_dir = save_dir / f".partial_{os.getpid()}"
+        partial_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.mixer = Mixer(partial_dir / f"recording_{timestamp}.wav")
+        try:
+            with sd.InputStream(callback=self.system_callback, channels=2, device=self.system_device) as system_stream:
+                with sd.InputStream(callback=self.mic_callback, channels=2, device=self.mic_device) as mic_stream:
+                    print("Recording started in background...")
+                    while Path(os.path.expanduser('~/.recording')).exists():
+                        # Auto-stop after 1 hour
+                        if time.time() - self.start_time > 3600:  # 3600 seconds = 1 hour
+                            print("Auto-stopping after 1 hour")
+                            Path(os.path.expanduser('~/.recording')).unlink()
+                            break
+                        time.sleep(0.05)
+        except Exception as e:
+            print(f"Recording error: {e}")
+
         try:
-            with sd.InputStream(callback=self.system_callback, channels=2, device=self.system_device) as system_stream, \\
-                 sd.InputStream(callback=self.mic_callback, channels=2, device=self.mic_device) as mic_stream:
-                print("Recording started in background...")
-                while Path(os.path.expanduser('~/.recording')).exists():
-                    # Auto-stop after 1 hour
-                    if time.time() - self.start_time > 3600:  # 3600 seconds = 1 hour
-                        print("Auto-stopping after 1 hour")
-                        Path(os.path.expanduser('~/.recording')).unlink()
-                        break
-                    time.sleep(0.1)
-                    
-            if self.recording_system or self.recording_mic:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                save_dir = Path.home() / "audio_recordings"
-                save_dir.mkdir(exist_ok=True)
-                
-                # Mix and save both streams
-                if self.recording_system and self.recording_mic:
-                    system_audio = np.concatenate(self.recording_system, axis=0)
-                    mic_audio = np.concatenate(self.recording_mic, axis=0)
-                    
-                    # Adjust volume levels
-                    system_gain = 1.5  # Increase system audio
-                    mic_gain = 1.0     # Keep mic at normal level
-                    
-                    if np.max(np.abs(system_audio)) > 0:
-                        system_audio = system_audio / np.max(np.abs(system_audio)) * system_gain
-                    if np.max(np.abs(mic_audio)) > 0:
-                        mic_audio = mic_audio / np.max(np.abs(mic_audio)) * mic_gain
-                    
-                    # Ensure same length
-                    min_len = min(len(system_audio), len(mic_audio))
-                    system_audio = system_audio[:min_len]
-                    mic_audio = mic_audio[:min_len]
-                    
-                    mixed_audio = system_audio + mic_audio
-                    
-                    # Prevent clipping
-                    if np.max(np.abs(mixed_audio)) > 1:
-                        mixed_audio = mixed_audio / np.max(np.abs(mixed_audio))
-                    
-                    audio_file = save_dir / f"recording_{timestamp}.wav"
-                    with sf.SoundFile(str(audio_file), mode='w', samplerate=44100, channels=2) as f:
-                        f.write(mixed_audio)
-                    print(f"Audio saved to: {audio_file}")
-                    
-                elif self.recording_system:
-                    audio_file = save_dir / f"recording_{timestamp}.wav"
-                    audio_data = np.concatenate(self.recording_system, axis=0)
-                    sf.write(str(audio_file), audio_data, 44100)
-                    print(f"Audio saved to: {audio_file}")
-                    
-                else:
-                    audio_file = save_dir / f"recording_{timestamp}.wav"
-                    audio_data = np.concatenate(self.recording_mic, axis=0)
-                    sf.write(str(audio_file), audio_data, 44100)
-                    print(f"Audio saved to: {audio_file}")
-                    
+            if self.mixer.close():
+                audio_file = save_dir / self.mixer.path.name
+                os.replace(self.mixer.path, audio_file)
+                print(f"Audio saved to: {audio_file}")
+            shutil.rmtree(partial_dir, ignore_errors=True)
         except Exception as e:
             print(f"Recording error: {e}")
         finally:
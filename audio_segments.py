@@ -0,0 +1,99 @@
+import os
+import re
+
+import numpy as np
+import soundfile as sf
+
+# Segments aim for this length, cut at the pause nearest the target
+SEGMENT_SECONDS = float(os.environ.get("SCRIPTY_SEGMENT_SECONDS", "120"))
+# Each segment also carries this much audio from its neighbours, so a cut
+# that lands inside a word still has the whole word in one of them
+OVERLAP_SECONDS = float(os.environ.get("SCRIPTY_SEGMENT_OVERLAP", "2"))
+SILENCE_DB = float(os.environ.get("SCRIPTY_SILENCE_DB", "-40"))
+MIN_SILENCE_SECONDS = 0.3
+FRAME_SECONDS = 0.02
+BLOCK_FRAMES = 64 * 1024
+
+
+def find_silences(path, threshold_db=SILENCE_DB, min_silence=MIN_SILENCE_SECONDS):
+    """
+    Quiet stretches of at least `min_silence` seconds, as (start, stop) frame
+    pairs. Reads the file in blocks and keeps one RMS value per 20 ms.
+    Returns (silences, total frames, samplerate).
+    """
+    threshold = 10 ** (threshold_db / 20)
+    with sf.SoundFile(str(path)) as source:
+        samplerate = source.samplerate
+        frame = max(1, int(samplerate * FRAME_SECONDS))
+        levels = []
+        for block in source.blocks(frame * 1024, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1)
+            count = -(-len(mono) // frame)
+            mono = np.pad(mono, (0, count * frame - len(mono)))
+            levels.append(np.sqrt((mono.reshape(count, frame) ** 2).mean(axis=1)))
+        total = source.frames
+
+    quiet = np.concatenate([[False], np.concatenate(levels) < threshold, [False]]) if levels else np.zeros(2, bool)
+    edges = np.flatnonzero(quiet[1:] != quiet[:-1])
+    min_frames = int(min_silence / FRAME_SECONDS)
+    silences = [
+        (int(start) * frame, min(int(stop) * frame, total))
+        for start, stop in zip(edges[::2], edges[1::2])
+        if stop - start >= min_frames
+    ]
+    return silences, total, samplerate
+
+
+def plan_segments(total, samplerate, silences, segment_seconds=SEGMENT_SECONDS, overlap_seconds=OVERLAP_SECONDS):
+    """
+    Split [0, total) into segments of about `segment_seconds`, cutting in the
+    middle of the pause closest to each target and hard-cutting only when
+    there is no pause within half a segment. Returns (start, stop) frame
+    pairs already widened by the overlap.
+    """
+    target = int(segment_seconds * samplerate)
+    overlap = int(overlap_seconds * samplerate)
+    cuts = [0]
+    while total - cuts[-1] > target * 1.5:
+        ideal = cuts[-1] + target
+        candidates = [
+            (start + stop) // 2 for start, stop in silences
+            if cuts[-1] + target // 2 <= (start + stop) // 2 <= cuts[-1] + target * 3 // 2
+        ]
+        cuts.append(min(candidates, key=lambda cut: abs(cut - ideal)) if candidates else ideal)
+    cuts.append(total)
+    return [
+        (max(0, start - overlap), min(total, stop + overlap))
+        for start, stop in zip(cuts, cuts[1:])
+    ]
+
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.casefold())
+
+
+def merge_overlap(previous, following, max_words=50):
+    """
+    Join two word lists whose ends overlap: the longest run of words ending
+    `previous` that also starts `following` is kept once. A garbled word at
+    either cut (from audio that starts or ends mid-word) may be skipped when
+    at least two words still line up.
+    """
+    left = [_normalize(word) for word in previous[-max_words:]]
+    right = [_normalize(word) for word in following[:max_words]]
+    for size in range(min(len(left), len(right)), 0, -1):
+        for drop_left, drop_right in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            if (drop_left or drop_right) and size < 2:
+                continue
+            end = len(left) - drop_left
+            if end - size >= 0 and left[end - size:end] == right[drop_right:drop_right + size]:
+                return previous[:len(previous) - drop_left] + following[drop_right + size:]
+    return previous + following
+
+
+def stitch(transcripts, max_overlap_words=50):
+    """Transcripts of consecutive overlapping segments as one text"""
+    words = []
+    for transcript in transcripts:
+        words = merge_overlap(words, transcript.split(), max_overlap_words)
+    return " ".join(words)
@@ -1,79 +1,243 @@
-import json
-import requests
 from pathlib import Path
+import asyncio
 import os
+import tempfile
+from audio_compact import COMPACT_FORMAT, FORMATS, compact, compact_for_upload, should_compact
+from audio_segments import find_silences, plan_segments, stitch
+from audio_upload import upload_for_transcription
+from recording_index import get_index
+from tool_executor import run_blocking
+from tool_tracing import span, traced
+from transcript_manifest import TranscriptManifest
 
 AUDIO_EXTENSIONS = {'.wav', '.mp3', '.m4a', '.aac', '.ogg', '.flac', '.wma', '.aiff'}
+# Segments of a long recording transcribed at once; 1 (the default) sends the
+# whole file in one request
+TRANSCRIBE_PARALLEL = int(os.environ.get("SCRIPTY_TRANSCRIBE_PARALLEL", "1"))
+# Recordings transcribed at once in batch mode
+BATCH_CONCURRENCY = int(os.environ.get("SCRIPTY_TRANSCRIBE_BATCH_CONCURRENCY", "2"))
 
-def transcribe_file(filepath):
+@traced("transcribe.upload", capture=("filepath",))
+async def transcribe_file(filepath, progress=None):
+    # Streams the file instead of loading it; large files go up in resumable chunks
     try:
-        with open(filepath, "rb") as f:
-            files = {"file": f}
-            headers = {"Authorization": f"Bearer {authtoken}"}
-            response = requests.post(
-                "https://scripty.me/api/assistant/transcribe",
-                files=files,
-                headers=headers
-            )
-            response.raise_for_status()
-            return response.json()
+        # Mono 16 kHz FLAC is typically 10-20x smaller than the recorder's WAVs
+        upload_path = await run_blocking(compact_for_upload, filepath)
+        result = await upload_for_transcription(upload_path, authtoken, progress=progress)
+        if upload_path != Path(filepath):
+            upload_path.unlink(missing_ok=True)
+        return result
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@traced("transcribe.segmented", capture=("filepath", "parallel"))
+async def transcribe_segmented(filepath, parallel=TRANSCRIBE_PARALLEL, progress=None):
+    """
+    Split a long recording at pauses into overlapping segments, transcribe up
+    to `parallel` of them at a time and stitch the transcripts in order.
+    Recordings that fit in one segment (or that soundfile can't read) go up
+    as a single request.
+    """
+    if parallel <= 1 or not should_compact(filepath):
+        return await transcribe_file(filepath, progress)
+    silences, total, samplerate = await run_blocking(find_silences, filepath)
+    segments = plan_segments(total, samplerate, silences)
+    if len(segments) == 1:
+        return await transcribe_file(filepath, progress)
+
+    format = COMPACT_FORMAT if COMPACT_FORMAT in FORMATS else "flac"
+    semaphore = asyncio.Semaphore(parallel)
+    done = 0
+
+    async def compact_segment(segment, start, stop):
+        compacting = asyncio.ensure_future(run_blocking(compact, filepath, segment, format, None, start, stop))
+        try:
+            await asyncio.shield(compacting)
+        except asyncio.CancelledError:
+            # The encoder thread can't be interrupted; it has to be done with
+            # the segment file before the directory is removed
+            await asyncio.gather(compacting, return_exceptions=True)
+            raise
+
+    async def transcribe_segment(index, start, stop, temp_dir):
+        nonlocal done
+        async with semaphore:
+            with span("transcribe.segment", index=index, seconds=round((stop - start) / samplerate, 1)):
+                segment = Path(temp_dir) / f"segment_{index:04d}{FORMATS[format][2]}"
+                try:
+                    await compact_segment(segment, start, stop)
+                    result = await upload_for_transcription(segment, authtoken)
+                except Exception as e:
+                    raise RuntimeError(f"Segment {index + 1} of {len(segments)} failed: {e}") from e
+                finally:
+                    segment.unlink(missing_ok=True)
+        if not result.get("success", True) or "transcript" not in result:
+            raise RuntimeError(f"Segment {index + 1} of {len(segments)} failed: {result.get('error') or 'no transcript'}")
+        done += 1
+        if progress is not None:
+            progress({"event": "segment", "index": index, "done": done, "segments": len(segments)})
+        return result["transcript"]
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="scripty_segments_") as temp_dir:
+            tasks = [
+                asyncio.ensure_future(transcribe_segment(index, start, stop, temp_dir))
+                for index, (start, stop) in enumerate(segments)
+            ]
+            try:
+                transcripts = await asyncio.gather(*tasks)
+            finally:
+                # One failed segment fails the recording; the rest must stop
+                # (and stop writing into temp_dir) before it is deleted
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "transcript": stitch(transcripts), "segments": len(segments)}
+
+def save_transcript(audio_path, transcript):
+    audio_file = Path(audio_path)
+    transcripts_dir = audio_file.parent / "transcripts"
+    transcripts_dir.mkdir(exist_ok=True)
+
+    transcript_file = transcripts_dir / f"transcript_{audio_file.stem}.txt"
+    with open(transcript_file, 'w') as f:
+        f.write(transcript)
+    return transcript_file
+
+@traced("transcribe.batch", capture=("folder",))
+async def transcribe_new(folder, parallel=TRANSCRIBE_PARALLEL, concurrency=BATCH_CONCURRENCY):
+    """
+    Transcribe every recording in `folder` whose contents haven't been
+    transcribed before. Files are matched by content hash, so renamed or
+    copied recordings (and duplicates within the folder) are uploaded once;
+    they just get a copy of the existing transcript.
+    """
+    folder = Path(folder)
+    files = [Path(entry["path"]) for entry in await run_blocking(get_index(AUDIO_EXTENSIONS).entries, folder)]
+    manifest = await run_blocking(TranscriptManifest)
+    digests = await asyncio.gather(*[run_blocking(manifest.digest, f) for f in files])
+
+    groups = {}
+    for audio_file, digest in zip(files, digests):
+        groups.setdefault(digest, []).append(audio_file)
+
+    transcribed, skipped, failed = [], [], []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def reuse(known, audio_files):
+        """
+        Recordings seen before only need their transcript file, copied from the
+        recorded one or from any of theirs still around. Returns False when
+        every copy is gone, so they are transcribed again.
+        """
+        transcript_files = [f.parent / "transcripts" / f"transcript_{f.stem}.txt" for f in audio_files]
+        source = next((Path(t) for t in [known["transcript_file"], *transcript_files] if os.path.exists(t)), None)
+        if source is None:
+            return False
+        text = None
+        for audio_file, transcript_file in zip(audio_files, transcript_files):
+            if not transcript_file.exists():
+                if text is None:
+                    with open(source) as f:
+                        text = f.read()
+                transcript_file = save_transcript(audio_file, text)
+            skipped.append({"file": str(audio_file), "transcript_file": str(transcript_file)})
+        return True
+
+    async def transcribe_group(digest, audio_files):
+        async with semaphore:
+            result = await transcribe_segmented(str(audio_files[0]), parallel)
+        if not result.get("success"):
+            failed.extend({"file": str(f), "error": result.get("error")} for f in audio_files)
+            return
+        transcript_files = [save_transcript(f, result["transcript"]) for f in audio_files]
+        manifest.record(digest, audio_files[0], transcript_files[0])
+        # Saved after every recording so an interrupted batch doesn't redo finished ones
+        await run_blocking(manifest.save)
+        transcribed.extend({"file": str(f), "transcript_file": str(t)} for f, t in zip(audio_files, transcript_files))
+
+    pending = []
+    for digest, audio_files in groups.items():
+        known = manifest.get(digest)
+        if not known or not reuse(known, audio_files):
+            pending.append(transcribe_group(digest, audio_files))
+    await asyncio.gather(*pending)
+    await run_blocking(manifest.save)
+
+    return {
+        "success": not failed,
+        "transcribed": transcribed,
+        "skipped": skipped,
+        "failed": failed,
+        "message": f"Transcribed {len(transcribed)} new recording(s), skipped {len(skipped)} already transcribed"
+                   + (f", {len(failed)} failed" if failed else ""),
+    }
+
 async def func(args):
     try:
         audio_path = args.get("audio_path", "")
+        parallel = int(args.get("parallel") or TRANSCRIBE_PARALLEL)
+
+        if args.get("batch"):
+            folder = Path(os.path.expanduser(audio_path)) if audio_path else Path.home() / "audio_recordings"
+            if not folder.is_dir():
+                return {"success": False, "error": f"Folder not found: {folder}"}
+            return await transcribe_new(folder, parallel)
         
         # If no path provided, use latest file from audio_recordings
         if not audio_path:
             recordings_dir = Path.home() / "audio_recordings"
             if not recordings_dir.exists():
-                return json.dumps({"success": False, "error": "No recordings directory found"})
+                return {"success": False, "error": "No recordings directory found"}
             
-            files = [(f, os.path.getmtime(f)) for f in recordings_dir.iterdir() 
-                    if f.is_file() and f.suffix.lower() in AUDIO_EXTENSIONS]
-            if not files:
-                return json.dumps({"success": False, "error": "No audio files found in recordings directory"})
+            latest = await run_blocking(get_index(AUDIO_EXTENSIONS).latest, recordings_dir)
+            if latest is None:
+                return {"success": False, "error": "No audio files found in recordings directory"}
             
-            audio_path = str(max(files, key=lambda x: x[1])[0])
+            audio_path = latest["path"]
         else:
             # Resolve home directory and expand path
             audio_path = os.path.expanduser(audio_path)
             
             # Handle partial filenames by searching in audio_recordings
             if not os.path.exists(audio_path):
-                recordings_dir = Path.home() / "audio_recordings"
-                # Try each audio extension
-                for ext in AUDIO_EXTENSIONS:
-                    matches = list(recordings_dir.glob(f"{audio_path}*{ext}"))
-                    if matches:
-                        audio_path = str(matches[0])
-                        break
+                recordings_dir = Path.home() / "audio_recordings" / os.path.dirname(audio_path)
+                match = await run_blocking(get_index(AUDIO_EXTENSIONS).find_prefix, recordings_dir, os.path.basename(audio_path))
+                if match is not None:
+                    audio_path = match["path"]
         
         if not os.path.exists(audio_path):
-            return json.dumps({"success": False, "error": f"Audio file not found: {audio_path}"})
+            return {"success": False, "error": f"Audio file not found: {audio_path}"}
         
         # Verify file extension
         if not Path(audio_path).suffix.lower() in AUDIO_EXTENSIONS:
-            return json.dumps({"success": False, "error": f"Unsupported file type. Supported types: {', '.join(AUDIO_EXTENSIONS)}"})
+            return {"success": False, "error": f"Unsupported file type. Supported types: {', '.join(AUDIO_EXTENSIONS)}"}
         
-        result = transcribe_file(audio_path)
+        # A recording transcribed before (under any name) isn't uploaded again
+        manifest = await run_blocking(TranscriptManifest)
+        digest = await run_blocking(manifest.digest, audio_path)
+        known = manifest.get(digest)
+        if known and os.path.exists(known["transcript_file"]):
+            with open(known["transcript_file"]) as f:
+                result = {"success": True, "transcript": f.read(), "reused": True}
+        else:
+            result = await transcribe_segmented(audio_path, parallel)
         
         # If transcription successful, save to transcripts directory
         if result.get("success"):
-            audio_file = Path(audio_path)
-            transcripts_dir = audio_file.parent / "transcripts"
-            transcripts_dir.mkdir(exist_ok=True)
-            
-            transcript_file = transcripts_dir / f"transcript_{audio_file.stem}.txt"
-            with open(transcript_file, 'w') as f:
-                f.write(result['transcript'])
+            transcript_file = save_transcript(audio_path, result['transcript'])
+            if not result.get("reused"):
+                # Recorded so a later call or batch run doesn't upload this recording again
+                manifest.record(digest, audio_path, transcript_file)
+                await run_blocking(manifest.save)
             
             result["message"] = f"Transcription saved to: {transcript_file}"
             
-        return json.dumps(result)
+        return result
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
 
 object = {
     "name": "audio_transcriber",
@@ -88,13 +252,27 @@ Examples:
 → {"audio_path": "recording_20240312"}  # Searches in ~/audio_recordings
 
 "transcribe ~/Downloads/meeting.mp3"
-→ {"audio_path": "~/Downloads/meeting.mp3"}  # Uses specific path""",
+→ {"audio_path": "~/Downloads/meeting.mp3"}  # Uses specific path
+
+"transcribe everything new"
+→ {"batch": true}  # Every recording in ~/audio_recordings not transcribed yet
+
+"transcribe the long meeting faster"
+→ {"audio_path": "meeting", "parallel": 4}  # Splits it at pauses, 4 segments at a time""",
     "parameters": {
         "type": "object",
         "properties": {
             "audio_path": {
                 "type": "string",
-                "description": "Path to audio file (optional, uses latest recording if empty)"
+                "description": "Path to audio file (optional, uses latest recording if empty); with batch, the folder to scan"
+            },
+            "batch": {
+                "type": "boolean",
+                "description": "Transcribe every recording in the folder that hasn't been transcribed yet"
+            },
+            "parallel": {
+                "type": "integer",
+                "description": "Split a long recording at pauses and transcribe this many segments at once (optional, default 1 sends it as one request)"
             }
         }
     }
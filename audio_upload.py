@@ -0,0 +1,242 @@
+import asyncio
+import json
+import mimetypes
+import os
+import random
+import threading
+import uuid
+from pathlib import Path
+
+import httpx
+
+import scripty_client
+from tool_executor import run_blocking
+from tool_tracing import span
+
+READ_SIZE = 256 * 1024
+CHUNK_SIZE = int(os.environ.get("SCRIPTY_UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+# Files at least this big use the resumable protocol when the server has it
+CHUNKED_MIN_BYTES = int(os.environ.get("SCRIPTY_CHUNKED_UPLOAD_MIN_BYTES", str(32 * 1024 * 1024)))
+MAX_CHUNK_RETRIES = int(os.environ.get("SCRIPTY_UPLOAD_CHUNK_RETRIES", "5"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Chunks in a row the server may answer without moving the offset forward
+MAX_STALLED_CHUNKS = int(os.environ.get("SCRIPTY_UPLOAD_MAX_STALLED_CHUNKS", "3"))
+# Upload ids of unfinished uploads, so a later call resumes instead of restarting
+STATE_PATH = Path(os.environ.get("SCRIPTY_UPLOAD_STATE", str(Path.home() / ".scripty" / "uploads.json")))
+
+_state_lock = threading.Lock()
+
+
+class ChunkedUploadUnsupported(Exception):
+    """The server has no resumable upload endpoint"""
+
+
+class ChunkedUploadError(Exception):
+    """The server's view of the upload can't be reconciled with ours"""
+
+
+def _read_range(path, offset, length):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def _quote_filename(name):
+    # What browsers send: the quote and line breaks would end the header
+    # parameter early, so they are percent-encoded
+    return name.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _emit(progress, event):
+    if progress is not None:
+        progress(event)
+
+
+class MultipartFile:
+    """
+    multipart/form-data body for one file, produced block by block so memory
+    stays at READ_SIZE whatever the file size. Its length is known up front,
+    so the request is sent with Content-Length rather than chunked encoding.
+    """
+
+    def __init__(self, path, field="file", progress=None):
+        self.path = Path(path)
+        self.size = self.path.stat().st_size
+        self.boundary = uuid.uuid4().hex
+        self.progress = progress
+        content_type = mimetypes.guess_type(self.path.name)[0] or "application/octet-stream"
+        self.head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{_quote_filename(self.path.name)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self.head) + self.size + len(self.tail)
+
+    async def __aiter__(self):
+        yield self.head
+        with open(self.path, "rb") as f:
+            sent = 0
+            while True:
+                block = await run_blocking(f.read, READ_SIZE)
+                if not block:
+                    break
+                sent += len(block)
+                _emit(self.progress, {"event": "progress", "sent": sent, "size": self.size})
+                yield block
+        yield self.tail
+
+
+async def upload_multipart(path, endpoint, authtoken, field="file", progress=None):
+    """POST a file as a streamed multipart body; returns the httpx.Response"""
+    body = MultipartFile(path, field, progress)
+    headers = {"Content-Type": body.content_type, "Content-Length": str(len(body))}
+    with span("upload.multipart", bytes=body.size):
+        return await scripty_client.post(endpoint, authtoken, content=body, headers=headers)
+
+
+def _load_state():
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(key, upload_id):
+    with _state_lock:
+        state = _load_state()
+        if upload_id is None:
+            state.pop(key, None)
+        else:
+            state[key] = upload_id
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(STATE_PATH, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+
+class ChunkedUpload:
+    """
+    Resumable upload to /transcribe/uploads: the server hands out an upload
+    id, chunks are PUT at explicit offsets and each chunk is retried on its
+    own. If the server reports a different offset (409) we continue from
+    there, and an unfinished upload of the same file resumes on the next call.
+    An upload that stops moving forward is abandoned with ChunkedUploadError.
+    """
+
+    def __init__(self, path, authtoken, endpoint="/transcribe/uploads", chunk_size=CHUNK_SIZE, progress=None):
+        self.path = Path(path)
+        stat = self.path.stat()
+        self.size = stat.st_size
+        self.authtoken = authtoken
+        self.endpoint = endpoint
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.key = f"{self.path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        self.upload_id = None
+
+    async def _request(self, method, path, **kwargs):
+        """Send with retries on connection errors, 429 and 5xx"""
+        for attempt in range(MAX_CHUNK_RETRIES + 1):
+            try:
+                response = await scripty_client.request(method, path, self.authtoken, **kwargs)
+            except httpx.TransportError:
+                if attempt == MAX_CHUNK_RETRIES:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_CHUNK_RETRIES:
+                    return response
+            await asyncio.sleep(random.uniform(0, min(30, 0.5 * 2 ** attempt)))
+
+    async def _start(self):
+        """Resume a known upload of this file, or create a new one; returns the offset to send from"""
+        upload_id = _load_state().get(self.key)
+        if upload_id:
+            response = await self._request("GET", f"{self.endpoint}/{upload_id}")
+            if response.status_code == 200:
+                self.upload_id = upload_id
+                offset = self._offset(response)
+                _emit(self.progress, {"event": "resumed", "upload_id": upload_id, "offset": offset, "size": self.size})
+                return offset
+
+        response = await self._request("POST", self.endpoint, json={
+            "filename": self.path.name,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+        })
+        if response.status_code in (404, 405, 501):
+            raise ChunkedUploadUnsupported(f"{self.endpoint} returned {response.status_code}")
+        response.raise_for_status()
+        self.upload_id = response.json()["upload_id"]
+        _save_state(self.key, self.upload_id)
+        _emit(self.progress, {"event": "started", "upload_id": self.upload_id, "offset": 0, "size": self.size})
+        return self._offset(response, 0)
+
+    def _offset(self, response, default=None):
+        """The offset the server expects next, checked against the file size"""
+        offset = response.json().get("offset", default)
+        if not isinstance(offset, int) or not 0 <= offset <= self.size:
+            _save_state(self.key, None)
+            raise ChunkedUploadError(f"Upload {self.upload_id} reported offset {offset!r} for a {self.size} byte file")
+        return offset
+
+    async def _send_chunk(self, offset):
+        length = min(self.chunk_size, self.size - offset)
+        data = await run_blocking(_read_range, self.path, offset, length)
+        with span("upload.chunk", offset=offset, bytes=len(data)):
+            response = await self._request(
+                "PUT",
+                f"{self.endpoint}/{self.upload_id}",
+                params={"offset": offset},
+                content=data,
+                headers={
+                    "Content-Type": "application/octet-stream",
+                    "Content-Range": f"bytes {offset}-{offset + len(data) - 1}/{self.size}",
+                },
+            )
+        if response.status_code == 409:
+            # The server has a different view of what arrived; continue from its offset
+            return self._offset(response)
+        response.raise_for_status()
+        return self._offset(response)
+
+    async def run(self):
+        """Upload the whole file and return the server's JSON reply to completion"""
+        offset = await self._start()
+        stalled = 0
+        while offset < self.size:
+            previous, offset = offset, await self._send_chunk(offset)
+            stalled = stalled + 1 if offset <= previous else 0
+            if stalled > MAX_STALLED_CHUNKS:
+                _save_state(self.key, None)
+                raise ChunkedUploadError(
+                    f"Upload {self.upload_id} made no progress past offset {offset} after {stalled} chunks")
+            _emit(self.progress, {"event": "chunk", "upload_id": self.upload_id, "offset": offset, "size": self.size})
+
+        response = await self._request("POST", f"{self.endpoint}/{self.upload_id}/complete")
+        response.raise_for_status()
+        _save_state(self.key, None)
+        _emit(self.progress, {"event": "completed", "upload_id": self.upload_id, "offset": offset, "size": self.size})
+        return response.json()
+
+
+async def upload_for_transcription(path, authtoken, progress=None):
+    """
+    Send an audio file to the transcription API: the resumable chunked
+    protocol for large files, a streamed multipart POST otherwise (or when the
+    server doesn't offer chunked uploads). Returns the server's JSON reply.
+    """
+    if os.path.getsize(path) >= CHUNKED_MIN_BYTES:
+        try:
+            return await ChunkedUpload(path, authtoken, progress=progress).run()
+        except ChunkedUploadUnsupported:
+            pass
+    response = await upload_multipart(path, "/transcribe", authtoken, progress=progress)
+    response.raise_for_status()
+    return response.json()
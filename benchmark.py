@@ -0,0 +1,635 @@
+import argparse
+import asyncio
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import io
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+from tool_encoding import encode_result_bytes, orjson
+from tool_registry import ToolRegistry, SCRIPTS_DIR
+
+BENCH_VERSION = 1
+CHILD_MARKER = "__BENCHMARK_RESULT__"
+MAX_RECORDED = 50
+
+# Third-party modules replaced by recording stubs so every script imports headless
+HEAVY_MODULES = {
+    "customtkinter", "tkinter", "PIL", "numpy", "pandas", "jobspy", "sounddevice",
+    "soundfile", "requests", "httpx", "plyer", "dateutil", "tzlocal", "pyperclip",
+    "cryptography", "psutil", "comtypes", "pycaw", "winshell",
+}
+
+# Arguments for the first call; chosen so no tool touches the real system
+BENCH_ARGS = {
+    "audio_recorder": {"operation": "stop"},
+    "audio_transcriber": {"audio_path": "bench_missing_recording"},
+    "calendar_manager": {"action": "get_events"},
+    "clearRecycleBin": {},
+    "controlVolume": {"adjust": 0},
+    "email_draft_manager": {"days": 1},
+    "express_setup": {"folder_name": "bench-app"},
+    "fastapi_setup": {"folder_name": "bench-app"},
+    "file_ops": {"operation": "latest", "source": "~", "destination": "~"},
+    "flask_setup": {"folder_name": "bench-app"},
+    "github_upload": {},
+    "web_search": {"query": "python asyncio"},
+    "image_convert": {"filename": "bench_missing.png"},
+    "job_search": {"job_title": "software engineer", "location": "Toronto, ON"},
+    "mern_setup": {"folder_name": "bench-app"},
+    "next_setup": {"folder_name": "bench-app"},
+    "notification_setter": {"operation": "cancel"},
+    "password_manager": {"command": "open"},
+    "stopwatch": {"command": "close"},
+    "sveltekit_setup": {"folder_name": "bench-app"},
+    "system_theme_toggle": {"action": "get"},
+    "Test Script": {"fein": "benchmark"},
+    "timer": {"command": "close"},
+    "vite_setup": {"folder_name": "bench-app"},
+    "vue_setup": {"folder_name": "bench-app"},
+}
+
+
+class Recorder:
+    """Collects side effects observed inside the child process"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.stub_calls = []
+        self.subprocess = []
+        self.network = []
+
+    def add(self, bucket, item):
+        items = getattr(self, bucket)
+        if item not in items and len(items) < MAX_RECORDED:
+            items.append(item)
+
+
+RECORDER = Recorder()
+
+
+class Stub:
+    """Stand-in for anything reached through a stubbed module"""
+
+    def __init__(self, path):
+        object.__setattr__(self, "_path", path)
+
+    def __getattr__(self, name):
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        if name.endswith("Error") or name.endswith("Exception"):
+            return type(name, (Exception,), {})
+        return Stub(f"{self._path}.{name}")
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        RECORDER.add("stub_calls", self._path)
+        return Stub(f"{self._path}()")
+
+    def __getitem__(self, key):
+        return Stub(f"{self._path}[]")
+
+    def __setitem__(self, key, value):
+        pass
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __bool__(self):
+        return False
+
+    def __int__(self):
+        return 0
+
+    def __float__(self):
+        return 0.0
+
+    def __index__(self):
+        return 0
+
+    def __str__(self):
+        return ""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __mro_entries__(self, bases):
+        return (object,)
+
+    def _binary(self, other):
+        return self
+
+    __add__ = __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = _binary
+    __truediv__ = __rtruediv__ = __floordiv__ = __mod__ = __neg__ = __abs__ = _binary
+
+
+class StubModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self.__path__ = []
+
+    def __getattr__(self, name):
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        if name.endswith("Error") or name.endswith("Exception"):
+            return type(name, (Exception,), {})
+        return Stub(f"{self.__name__}.{name}")
+
+
+class StubFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def __init__(self, names):
+        self.names = set(names)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname.split(".")[0] in self.names:
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return StubModule(spec.name)
+
+    def exec_module(self, module):
+        pass
+
+
+class FakePopen:
+    def __init__(self, args, *popenargs, **kwargs):
+        RECORDER.add("subprocess", args if isinstance(args, str) else " ".join(map(str, args)))
+        self.args = args
+        self.returncode = 0
+        self.pid = 0
+        self._text = kwargs.get("text") or kwargs.get("universal_newlines") or kwargs.get("encoding")
+        self.stdout = self.stderr = None
+
+    def communicate(self, input=None, timeout=None):
+        empty = "" if self._text else b""
+        return empty, empty
+
+    def wait(self, timeout=None):
+        return 0
+
+    def poll(self):
+        return 0
+
+    def kill(self):
+        pass
+
+    terminate = kill
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _fake_run(args, *popenargs, **kwargs):
+    FakePopen(args, **kwargs)
+    empty = "" if kwargs.get("text") else b""
+    return subprocess.CompletedProcess(args, 0, empty, empty)
+
+
+def _blocked_network(*args, **kwargs):
+    RECORDER.add("network", str(args[0]) if args else "")
+    raise OSError("Network disabled by benchmark")
+
+
+def _blocked_connect(self, address):
+    RECORDER.add("network", str(address))
+    raise OSError("Network disabled by benchmark")
+
+
+def install_sandbox(stub_names):
+    """Stub heavy modules and intercept subprocess/network calls"""
+    if stub_names:
+        sys.meta_path.insert(0, StubFinder(stub_names))
+    subprocess.Popen = FakePopen
+    subprocess.run = _fake_run
+    subprocess.call = lambda *a, **k: _fake_run(*a, **k).returncode
+    subprocess.check_call = subprocess.call
+    subprocess.check_output = lambda *a, **k: _fake_run(*a, **k).stdout
+    subprocess.getoutput = lambda cmd: (FakePopen(cmd), "0")[1]
+    os.system = lambda cmd: (FakePopen(cmd), 0)[1]
+    socket.getaddrinfo = _blocked_network
+    socket.create_connection = _blocked_network
+    socket.socket.connect = _blocked_connect
+    socket.socket.connect_ex = _blocked_connect
+
+
+def _list_files(*roots):
+    files = set()
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                files.add(os.path.relpath(os.path.join(dirpath, name), root))
+    return files
+
+
+class SideEffects:
+    """Snapshot of process state used to diff before/after a phase"""
+
+    def __init__(self, root):
+        self.root = root
+        RECORDER.reset()
+        logger = logging.getLogger()
+        self.level = logger.level
+        self.handlers = len(logger.handlers)
+        self.threads = threading.active_count()
+        self.files = _list_files(root)
+        self.stdout = io.StringIO()
+
+    def collect(self):
+        logger = logging.getLogger()
+        return {
+            "stub_calls": list(RECORDER.stub_calls),
+            "subprocess": list(RECORDER.subprocess),
+            "network": list(RECORDER.network),
+            "logging": {
+                "level_changed": logger.level != self.level,
+                "handlers_added": len(logger.handlers) - self.handlers,
+            },
+            "threads_started": threading.active_count() - self.threads,
+            "files_created": sorted(_list_files(self.root) - self.files)[:MAX_RECORDED],
+            "stdout_bytes": len(self.stdout.getvalue().encode("utf-8")),
+        }
+
+
+def run_child(path, entry_point, args, stub_names):
+    """Import one script cold and call its entry point once"""
+    root = os.getcwd()
+    install_sandbox(stub_names)
+    sys.path.insert(0, str(Path(path).parent))
+    real_stdout = sys.stdout
+    result = {"import_ms": None, "first_call_ms": None, "error": None}
+
+    effects = SideEffects(root)
+    sys.stdout = effects.stdout
+    try:
+        start = time.perf_counter()
+        spec = importlib.util.spec_from_file_location(f"scripty_tool_{Path(path).stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        module.authtoken = "benchmark-token"
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        result["import_ms"] = (time.perf_counter() - start) * 1000
+    except BaseException as e:
+        sys.stdout = real_stdout
+        result["error"] = f"import failed: {type(e).__name__}: {e}"
+        result["import_side_effects"] = effects.collect()
+        return result
+    finally:
+        sys.stdout = real_stdout
+    result["import_side_effects"] = effects.collect()
+
+    loop = asyncio.new_event_loop()
+    effects = SideEffects(root)
+    sys.stdout = effects.stdout
+    try:
+        handler = getattr(module, entry_point)
+        start = time.perf_counter()
+        output = loop.run_until_complete(handler(args))
+        result["first_call_ms"] = (time.perf_counter() - start) * 1000
+        encoded = output if isinstance(output, str) else json.dumps(output, default=str)
+        result["result_bytes"] = len(encoded.encode("utf-8"))
+        try:
+            parsed = json.loads(encoded)
+            result["call_status"] = "error" if isinstance(parsed, dict) and (
+                "error" in parsed or parsed.get("success") is False) else "ok"
+        except ValueError:
+            result["call_status"] = "ok"
+    except BaseException as e:
+        result["error"] = f"call failed: {type(e).__name__}: {e}"
+    finally:
+        sys.stdout = real_stdout
+        loop.close()
+    result["call_side_effects"] = effects.collect()
+    return result
+
+
+def _spawn_child(tool, stub_names, timeout):
+    with tempfile.TemporaryDirectory(prefix="scripty-bench-") as tmp:
+        env = dict(os.environ, HOME=tmp, USERPROFILE=tmp, PYTHONDONTWRITEBYTECODE="1")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent), env.get("PYTHONPATH")]))
+        command = [
+            sys.executable, str(Path(__file__).resolve()), "--child", tool["path"],
+            "--entry-point", tool["entry_point"],
+            "--args", json.dumps(BENCH_ARGS.get(tool["name"], {})),
+            "--stubs", ",".join(sorted(stub_names)),
+        ]
+        try:
+            proc = subprocess.run(command, cwd=tmp, env=env, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"error": f"timed out after {timeout}s"}
+        for line in proc.stdout.splitlines():
+            if line.startswith(CHILD_MARKER):
+                return json.loads(line[len(CHILD_MARKER):])
+        return {"error": f"child exited with {proc.returncode}: {proc.stderr.strip()[-500:]}"}
+
+
+def _summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "median": round(statistics.median(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+        "runs": len(values),
+    }
+
+
+def measure_startup(repeat):
+    """Bare interpreter start so import numbers can be read against it"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return _summary(timings)
+
+
+def run_benchmark(scripts_dir=SCRIPTS_DIR, tools=None, repeat=5, stub=True, timeout=60):
+    """Benchmark every tool and return a JSON-serializable report"""
+    registry = ToolRegistry(scripts_dir, cache_path=None)
+    stub_names = HEAVY_MODULES if stub else set()
+    report = {
+        "version": BENCH_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "stubbed_modules": sorted(stub_names),
+        "startup_ms": measure_startup(repeat),
+        "tools": {},
+    }
+
+    for name, tool in sorted(registry.tools.items()):
+        if tools and name not in tools and tool["module"] not in tools:
+            continue
+        runs = [_spawn_child(tool, stub_names, timeout) for _ in range(repeat)]
+        last = runs[-1]
+        report["tools"][name] = {
+            "module": tool["module"],
+            "entry_point": tool["entry_point"],
+            "args": BENCH_ARGS.get(name, {}),
+            "import_ms": _summary([run.get("import_ms") for run in runs]),
+            "first_call_ms": _summary([run.get("first_call_ms") for run in runs]),
+            "call_status": last.get("call_status"),
+            "result_bytes": last.get("result_bytes"),
+            "import_side_effects": last.get("import_side_effects"),
+            "call_side_effects": last.get("call_side_effects"),
+            "error": last.get("error"),
+        }
+    return report
+
+
+def sample_job_search_result(count):
+    """A job_search-shaped result with `count` jobs"""
+    jobs = []
+    for i in range(count):
+        jobs.append({
+            "title": f"Senior Software Engineer {i}",
+            "company": f"Company {i % 97}",
+            "location": "Toronto, ON, CA",
+            "date_posted": "2024-03-%02d" % (i % 28 + 1),
+            "job_type": "fulltime",
+            "is_remote": i % 3 == 0,
+            "company_industry": "Software Development",
+            "job_url": f"https://www.example.com/jobs/view/{1000000 + i}",
+            "salary": f"{90000 + i} - {130000 + i} CAD yearly",
+            "status": "Not Applied",
+        })
+    return {
+        "success": True,
+        "jobs_found": count,
+        "save_location": "/home/user/Job Search Results/search_2024-03-12_10-00-00",
+        "results": jobs,
+        "sheets_export": {"success": True},
+    }
+
+
+def _measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"time_ms": _summary(timings), "peak_bytes": peak}
+
+
+def measure_encoding(count=1000, repeat=20):
+    """
+    Compare the old result path (script json.dumps, host json.loads, host
+    json.dumps again) with returning a native dict that is encoded once.
+    """
+    result = sample_job_search_result(count)
+
+    def legacy():
+        return json.dumps(json.loads(json.dumps(result))).encode("utf-8")
+
+    def native():
+        return encode_result_bytes(result)
+
+    return {
+        "jobs": count,
+        "result_bytes": len(native()),
+        "orjson": orjson is not None,
+        "legacy": _measure(legacy, repeat),
+        "native": _measure(native, repeat),
+    }
+
+
+def synthetic_recording(path, seconds, samplerate=44100):
+    """
+    A speech-like stereo WAV written the way audio_recorder writes them:
+    voiced syllables with pauses over a faint noise floor.
+    """
+    import numpy as np
+    import soundfile as sf
+
+    rng = np.random.default_rng(0)
+    with sf.SoundFile(str(path), "w", samplerate=samplerate, channels=2) as f:
+        for second in range(int(seconds)):
+            t = np.arange(samplerate) / samplerate
+            pitch = 110 + 40 * rng.random()
+            voice = sum(np.sin(2 * np.pi * pitch * k * t + rng.random()) / k for k in range(1, 12))
+            # ~4 syllables a second, silent in one second out of five
+            envelope = np.clip(np.sin(2 * np.pi * 2 * t + rng.random()), 0, None) ** 2
+            if second % 5 == 4:
+                envelope[:] = 0
+            mono = 0.2 * voice * envelope + 0.002 * rng.standard_normal(samplerate)
+            f.write(np.stack([mono, 0.8 * mono], axis=1).astype(np.float32))
+
+
+def measure_audio_upload(seconds=600, upload_kbps=20000, formats=("flac", "opus")):
+    """
+    End-to-end transcription upload of one recording against the local fake
+    server with limited upload bandwidth: the WAV as recorded versus its
+    compacted copy (compaction time included).
+    """
+    import scripty_client
+    from audio_compact import compact_for_upload
+    from audio_upload import upload_for_transcription
+    from fake_scripty_server import start_server
+
+    server = start_server(upload_kbps=upload_kbps)
+    scripty_client.configure(base_url=server.base_url)
+    report = {"seconds": seconds, "upload_kbps": upload_kbps, "runs": {}}
+
+    async def upload(path, format):
+        started = time.perf_counter()
+        upload_path = compact_for_upload(path, format) if format else Path(path)
+        compacted = time.perf_counter()
+        await upload_for_transcription(upload_path, "benchmark")
+        finished = time.perf_counter()
+        await scripty_client.aclose()
+        size = upload_path.stat().st_size
+        if upload_path != Path(path):
+            upload_path.unlink()
+        return {
+            "bytes": size,
+            "compact_s": round(compacted - started, 3),
+            "upload_s": round(finished - compacted, 3),
+            "total_s": round(finished - started, 3),
+        }
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            recording = Path(temp_dir) / "recording.wav"
+            synthetic_recording(recording, seconds)
+            report["runs"]["wav"] = asyncio.run(upload(recording, None))
+            for format in formats:
+                run = asyncio.run(upload(recording, format))
+                run["reduction"] = round(report["runs"]["wav"]["bytes"] / run["bytes"], 1)
+                run["speedup"] = round(report["runs"]["wav"]["total_s"] / run["total_s"], 1)
+                report["runs"][format] = run
+    finally:
+        server.shutdown()
+        server.server_close()
+    return report
+
+
+def measure_segmented_transcription(seconds=600, levels=(1, 2, 4, 8), transcribe_rtf=0.05):
+    """
+    Transcribe one fake-speech recording as a single request and then in
+    parallel segments, against a fake server that takes `transcribe_rtf`
+    seconds per second of audio. Checks the stitched text matches.
+    """
+    import random
+    import scripty_client
+    from fake_scripty_server import FAKE_WORDS, start_server, write_fake_speech
+
+    transcriber = importlib.util.module_from_spec(
+        importlib.util.spec_from_file_location("bench_audio_transcripter", SCRIPTS_DIR / "audio_transcripter.py"))
+    transcriber.authtoken = "benchmark"
+    transcriber.__spec__.loader.exec_module(transcriber)
+
+    server = start_server(transcribe_rtf=transcribe_rtf)
+    scripty_client.configure(base_url=server.base_url)
+    rng = random.Random(0)
+    phrases = []
+    while sum(len(phrase) for phrase in phrases) * 0.35 + len(phrases) * 0.8 < seconds:
+        phrases.append([rng.choice(FAKE_WORDS) for _ in range(rng.randint(2, 15))])
+    report = {"seconds": seconds, "transcribe_rtf": transcribe_rtf, "runs": {}}
+
+    async def transcribe(path, parallel):
+        started = time.perf_counter()
+        result = await transcriber.transcribe_segmented(path, parallel)
+        elapsed = time.perf_counter() - started
+        await scripty_client.aclose()
+        return result, elapsed
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            recording = Path(temp_dir) / "recording.wav"
+            write_fake_speech(recording, phrases)
+            single, baseline = asyncio.run(transcribe(recording, 1))
+            for parallel in levels:
+                result, elapsed = asyncio.run(transcribe(recording, parallel))
+                report["runs"][parallel] = {
+                    "segments": result.get("segments", 1),
+                    "total_s": round(elapsed, 3),
+                    "speedup": round(baseline / elapsed, 1),
+                    "matches_single": result.get("transcript") == single.get("transcript"),
+                }
+    finally:
+        server.shutdown()
+        server.server_close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-import and first-call benchmark for every script")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per tool")
+    parser.add_argument("--tools", default="", help="Comma-separated tool or module names (default: all)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--no-stubs", action="store_true", help="Import the real third-party modules")
+    parser.add_argument("--timeout", type=int, default=60, help="Seconds before a child run is abandoned")
+    parser.add_argument("--encoding", action="store_true", help="Benchmark result serialization instead of imports")
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs in the sample result for --encoding")
+    parser.add_argument("--audio", action="store_true", help="Benchmark transcription uploads with and without compaction")
+    parser.add_argument("--audio-seconds", type=int, default=600, help="Length of the recording for --audio")
+    parser.add_argument("--upload-kbps", type=int, default=20000, help="Simulated upload bandwidth for --audio")
+    parser.add_argument("--segments", action="store_true",
+                        help="Benchmark segmented transcription at increasing parallelism")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--entry-point", default="func", help=argparse.SUPPRESS)
+    parser.add_argument("--args", default="{}", help=argparse.SUPPRESS)
+    parser.add_argument("--stubs", default="", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.child:
+        stub_names = set(filter(None, options.stubs.split(",")))
+        result = run_child(options.child, options.entry_point, json.loads(options.args), stub_names)
+        sys.stdout.write(CHILD_MARKER + json.dumps(result) + "\n")
+        sys.stdout.flush()
+        # Skip interpreter teardown so leftover stub threads/windows can't hang the run
+        os._exit(0)
+
+    if options.encoding:
+        report = measure_encoding(options.jobs, max(options.repeat, 1))
+    elif options.audio:
+        report = measure_audio_upload(options.audio_seconds, options.upload_kbps)
+    elif options.segments:
+        report = measure_segmented_transcription(options.audio_seconds)
+    else:
+        tools = set(filter(None, options.tools.split(",")))
+        report = run_benchmark(tools=tools or None, repeat=options.repeat, stub=not options.no_stubs, timeout=options.timeout)
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Benchmark report saved to: {options.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
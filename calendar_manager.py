@@ -1,9 +1,9 @@
-import json
-import requests
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import platform
 from tzlocal import get_localzone
+import scripty_client
+from tool_tracing import traced
 
 def get_user_timezone():
     """Get the user's local timezone"""
@@ -78,7 +78,8 @@ def parse_time(time_str):
         except ValueError:
             raise ValueError(f"Could not parse time string: {time_str}")
 
-def create_calendar_event(summary, start_time, end_time=None, description=None):
+@traced("calendar.create_event")
+async def create_calendar_event(summary, start_time, end_time=None, description=None):
     """
     Create a new calendar event
     """
@@ -102,13 +103,9 @@ def create_calendar_event(summary, start_time, end_time=None, description=None):
         if description:
             data["description"] = description
         
-        headers = {
-            "Authorization": f"Bearer {authtoken}"
-        }
-        
-        response = requests.post(
-            "https://scripty.me/api/assistant/calendar/events",
-            headers=headers,
+        response = await scripty_client.post(
+            "/calendar/events",
+            authtoken,
             json=data
         )
         response.raise_for_status()
@@ -116,24 +113,20 @@ def create_calendar_event(summary, start_time, end_time=None, description=None):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def get_calendar_events():
+@traced("calendar.get_events")
+async def get_calendar_events():
     """
     Get all calendar events
     """
     try:
-        headers = {
-            "Authorization": f"Bearer {authtoken}"
-        }
-        response = requests.get(
-            "https://scripty.me/api/assistant/calendar/events",
-            headers=headers
-        )
+        response = await scripty_client.get("/calendar/events", authtoken)
         response.raise_for_status()
         return response.json()
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def get_free_slots(start_date=None, end_date=None, min_duration=30):
+@traced("calendar.get_free_slots")
+async def get_free_slots(start_date=None, end_date=None, min_duration=30):
     """
     Get free time slots in calendar.
     start_date: can be 'today', 'tomorrow', or other supported date expressions
@@ -165,13 +158,7 @@ def get_free_slots(start_date=None, end_date=None, min_duration=30):
             except ValueError as e:
                 return {"success": False, "error": str(e)}
         
-        headers = {
-            "Authorization": f"Bearer {authtoken}"
-        }
-        response = requests.get(
-            "https://scripty.me/api/assistant/calendar/events",
-            headers=headers
-        )
+        response = await scripty_client.get("/calendar/events", authtoken)
         response.raise_for_status()
         events = response.json().get('items', [])
         
@@ -227,37 +214,37 @@ async def func(args):
     try:
         action = args.get("action")
         if not action:
-            return json.dumps({"success": False, "error": "Action is required"})
+            return {"success": False, "error": "Action is required"}
         
         if action == "get_free_slots":
-            return json.dumps(get_free_slots(
+            return await get_free_slots(
                 args.get("start_date"),
                 args.get("end_date"),
                 int(args.get("min_duration", 30))
-            ))
+            )
         elif action == "get_events":
-            return json.dumps(get_calendar_events())
+            return await get_calendar_events()
         elif action == "create_event":
             # Only validate start_time
             if "start_time" not in args:
-                return json.dumps({
+                return {
                     "success": False, 
                     "error": "Missing required field: start_time"
-                })
+                }
             
-            return json.dumps(create_calendar_event(
+            return await create_calendar_event(
                 args.get("summary", "New Event"),
                 args["start_time"],
                 args.get("end_time"),
                 args.get("description")
-            ))
+            )
         else:
-            return json.dumps({
+            return {
                 "success": False, 
                 "error": f"Unknown action: {action}"
-            })
+            }
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
 
 # API definition with detailed parameter descriptions
 object = {
@@ -0,0 +1,264 @@
+import asyncio
+import base64
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+import page_content
+import scripty_client
+import serper_client
+
+CASSETTE_VERSION = 1
+
+# The cassette in use, if any; see use()
+_active = None
+
+
+class CassetteMiss(Exception):
+    """Replay found no recorded interaction for a request"""
+
+
+def _digest(data):
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def http_keys(method, url, body_digest):
+    """
+    (exact, loose) match keys for an HTTP request. The port is left out so
+    recordings made against a local server replay on any port; the loose key
+    ignores the query string and body.
+    """
+    parts = urlsplit(str(url))
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    return ["http", method, parts.hostname, target, body_digest], ["http", method, parts.hostname, parts.path]
+
+
+def _encode_value(value):
+    # DataFrames (jobspy results) round-trip through pandas' own JSON format
+    if hasattr(value, "to_json") and hasattr(value, "columns"):
+        return {"__dataframe__": value.to_json(orient="table", date_format="iso")}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "__dataframe__" in value:
+        import pandas as pd
+        return pd.read_json(io.StringIO(value["__dataframe__"]), orient="table")
+    return value
+
+
+class Cassette:
+    """
+    Recorded interactions stored as gzipped JSON. In replay mode requests are
+    matched by exact key first, then loosely; identical requests replay their
+    recordings in order, repeating the last one when they run out.
+    """
+
+    def __init__(self, path, mode="replay", latency_scale=1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.interactions = []
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._by_key = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}")
+        self.interactions = data["interactions"]
+        for interaction in self.interactions:
+            self._by_key.setdefault(json.dumps(interaction["key"]), []).append(interaction)
+            self._by_key.setdefault(json.dumps(interaction["loose"]), []).append(interaction)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "interactions": list(self.interactions)}
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def record(self, interaction):
+        with self._lock:
+            self.interactions.append(interaction)
+            self.stats["recorded"] += 1
+
+    def find(self, key, loose):
+        with self._lock:
+            for candidate in (key, loose):
+                candidate = json.dumps(candidate)
+                matches = self._by_key.get(candidate)
+                if matches:
+                    cursor = self._cursors.get(candidate, 0)
+                    self._cursors[candidate] = cursor + 1
+                    self.stats["replayed"] += 1
+                    return matches[min(cursor, len(matches) - 1)]
+            self.stats["misses"] += 1
+        raise CassetteMiss(f"No recorded interaction for {key}")
+
+    def delay(self, interaction):
+        return interaction["elapsed"] * self.latency_scale
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records real exchanges or replays recorded ones"""
+
+    def __init__(self, cassette, inner=None):
+        self.cassette = cassette
+        self.inner = inner
+
+    async def handle_async_request(self, request):
+        try:
+            body_digest = _digest(request.content)
+        except httpx.RequestNotRead:
+            # Streaming uploads are matched without their body
+            body_digest = None
+        key, loose = http_keys(request.method, request.url, body_digest)
+
+        if self.cassette.replaying:
+            interaction = self.cassette.find(key, loose)
+            await asyncio.sleep(self.cassette.delay(interaction))
+            return httpx.Response(
+                interaction["status"],
+                headers=interaction["headers"],
+                content=base64.b64decode(interaction["body"]),
+                request=request,
+            )
+
+        if self.inner is None:
+            self.inner = httpx.AsyncHTTPTransport()
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        # Raw bytes, so Content-Encoding still applies when the client decodes them
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        self.cassette.record({
+            "key": key,
+            "loose": loose,
+            "status": response.status_code,
+            "headers": [[name, value] for name, value in response.headers.multi_items()],
+            "body": base64.b64encode(body).decode("ascii"),
+            "elapsed": time.perf_counter() - started,
+        })
+        return httpx.Response(response.status_code, headers=response.headers, content=body, request=request)
+
+    async def aclose(self):
+        # The client owning this transport is closing; a new one may reuse it
+        inner, self.inner = self.inner, None
+        if inner is not None:
+            await inner.aclose()
+
+
+class CassettePool:
+    """Stands in for serper_client's connection pool"""
+
+    def __init__(self, cassette):
+        self.cassette = cassette
+
+    @property
+    def host(self):
+        return serper_client.get_pool().host
+
+    def request(self, method, path, body=None, headers=None):
+        key, loose = http_keys(method, serper_client.settings["url"] + path, _digest(body))
+
+        if self.cassette.replaying:
+            interaction = self.cassette.find(key, loose)
+            time.sleep(self.cassette.delay(interaction))
+            return serper_client.Response(
+                interaction["status"],
+                dict(interaction["headers"]),
+                base64.b64decode(interaction["body"]),
+            )
+
+        started = time.perf_counter()
+        response = serper_client.get_pool().request(method, path, body, headers)
+        self.cassette.record({
+            "key": key,
+            "loose": loose,
+            "status": response.status,
+            "headers": list(response.headers.items()),
+            "body": base64.b64encode(response.body).decode("ascii"),
+            "elapsed": time.perf_counter() - started,
+        })
+        return response
+
+
+def call(name, fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs), recorded or replayed by the active cassette. For
+    network-bound library calls that don't go through our HTTP clients,
+    e.g. jobspy's scrape_jobs; tools get it as the call_library global.
+    """
+    cassette = _active
+    if cassette is None:
+        return fn(*args, **kwargs)
+    arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+    key, loose = ["call", name, _digest(arguments)], ["call", name]
+
+    if cassette.replaying:
+        interaction = cassette.find(key, loose)
+        time.sleep(cassette.delay(interaction))
+        return _decode_value(interaction["result"])
+
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    cassette.record({
+        "key": key,
+        "loose": loose,
+        "result": _encode_value(result),
+        "elapsed": time.perf_counter() - started,
+    })
+    return result
+
+
+@contextlib.contextmanager
+def use(path, mode="replay", latency_scale=1.0):
+    """
+    Record every scripty.me, Serper and page request (and cassette.call()
+    library calls) made in this process to `path`, or replay them from it.
+    latency_scale stretches recorded latencies on replay; 0 replays instantly.
+    """
+    global _active
+    cassette = Cassette(path, mode, latency_scale)
+    saved = (
+        scripty_client.settings["transport"],
+        page_content.settings["transport"],
+        serper_client.settings["transport"],
+    )
+    scripty_client.configure(transport=CassetteTransport(cassette))
+    page_content.configure(transport=CassetteTransport(cassette))
+    serper_client.configure(transport=CassettePool(cassette))
+    _active = cassette
+    try:
+        yield cassette
+    finally:
+        _active = None
+        scripty_client.configure(transport=saved[0])
+        page_content.configure(transport=saved[1])
+        serper_client.configure(transport=saved[2])
+        if mode == "record":
+            cassette.save()
@@ -1,7 +1,8 @@
 import json
-import requests
 import re
 from datetime import datetime, timedelta
+import scripty_client
+from tool_tracing import traced
 
 def extract_sender_info(from_header):
    name = re.match(r'^([^<]+)', from_header)
@@ -11,7 +12,8 @@ def extract_sender_info(from_header):
        'email': email[0] if email else from_header.strip()
    }
 
-def batch_classify_emails(emails):
+@traced("email.batch_classify")
+async def batch_classify_emails(emails):
    messages = [
        {"role": "system", "content": "You are an email assistant that determines if emails need replies."},
        {"role": "user", "content": f"""For each email, determine if it needs a reply. Reply with a JSON array of true/false.
@@ -27,18 +29,19 @@ Rules:
 - false: Marketing, newsletters, broadcasts, automated notifications, no-reply addresses"""}
    ]
 
-   response = requests.post(
-       "https://scripty.me/api/assistant/call",
-       headers={"Authorization": f"Bearer {authtoken}"},
+   response = (await scripty_client.post(
+       "/call",
+       authtoken,
        json={"model": "mixtral-8x7b-32768", "messages": messages}
-   ).json()
+   )).json()
 
    try:
        return json.loads(response.get('content', '[]'))
    except:
        return [False] * len(emails)
 
-def generate_draft(subject, body, from_header, to_addr):
+@traced("email.generate_draft")
+async def generate_draft(subject, body, from_header, to_addr):
    sender = extract_sender_info(from_header)
    
    messages = [
@@ -55,14 +58,14 @@ Guidelines:
 4. Be concise"""}
    ]
 
-   response = requests.post(
-       "https://scripty.me/api/assistant/call",
-       headers={"Authorization": f"Bearer {authtoken}"},
+   response = (await scripty_client.post(
+       "/call",
+       authtoken,
        json={
            "model": "mixtral-8x7b-32768",
            "messages": messages
        }
-   ).json()
+   )).json()
 
    draft = response.get('content', "Thank you for your email. I will respond shortly.")
    
@@ -72,12 +75,13 @@ Guidelines:
        "reply_subject": f"Re: {re.sub('^(Re: )*', '', subject)}"
    }
 
-def process_unread_emails(days=1):
+@traced("email.process_unread", capture=("days",))
+async def process_unread_emails(days=1):
    try:
        print(f"Checking emails from past {days} days")
-       response = requests.get(
-           "https://scripty.me/api/assistant/email/unread",
-           headers={"Authorization": f"Bearer {authtoken}"},
+       response = await scripty_client.get(
+           "/email/unread",
+           authtoken,
            params={"days": days}
        )
        emails = response.json()
@@ -86,11 +90,11 @@ def process_unread_emails(days=1):
            return {"success": False, "error": "Invalid response from email API"}
        
        results = []
-       needs_reply = batch_classify_emails(emails)
+       needs_reply = await batch_classify_emails(emails)
        
        for i, email_data in enumerate(emails):
            if needs_reply[i]:
-               draft = generate_draft(
+               draft = await generate_draft(
                    email_data["subject"],
                    email_data["body"], 
                    email_data["from"],
@@ -105,9 +109,9 @@ def process_unread_emails(days=1):
                        "to": draft["reply_to"]
                    }
                    
-                   requests.post(
-                       "https://scripty.me/api/assistant/email/draft",
-                       headers={"Authorization": f"Bearer {authtoken}"},
+                   await scripty_client.post(
+                       "/email/draft",
+                       authtoken,
                        json=formatted_draft
                    )
                    results.append({
@@ -122,9 +126,9 @@ def process_unread_emails(days=1):
 async def func(args):
    try:
        days = int(args.get("days", 1))
-       return json.dumps(process_unread_emails(days))
+       return await process_unread_emails(days)
    except Exception as e:
-       return json.dumps({"success": False, "error": str(e)})
+       return {"success": False, "error": str(e)}
 
 object = {
    "name": "email_draft_manager",
@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -25,7 +28,7 @@ def run_command(command, cwd=None):
         print(f"Error executing command: {str(e)}")
         return False
 
-def setup_express_ts(folder_name="express-ts-app"):
+async def setup_express_ts(folder_name="express-ts-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -82,7 +85,7 @@ def setup_express_ts(folder_name="express-ts-app"):
         
         for cmd in commands:
             print(f"\nExecuting: {cmd}")
-            if not run_command(cmd, cwd=full_path):
+            if not await run_blocking(run_command, cmd, cwd=full_path):
                 return False
         
         # Create tsconfig.json
@@ -262,7 +265,7 @@ async def func(args):
         path = args.get("path", os.path.expanduser("~"))
         folder_name = args.get("folder_name", "express-ts-app")
         
-        if setup_express_ts(folder_name):
+        if await setup_express_ts(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"Express.js + TypeScript project created successfully in {folder_name}"
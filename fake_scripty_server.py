@@ -0,0 +1,508 @@
+import argparse
+import hashlib
+import html
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import numpy as np
+    import soundfile as sf
+except ImportError:
+    np = sf = None
+
+API_PREFIX = "/api/assistant"
+
+# latency_ms:     fixed delay added to every response
+# jitter_ms:      extra uniform random delay
+# error_rate:     fraction of requests answered with error_status
+# endpoint_latency_ms: per-path overrides, e.g. {"/transcribe": 2000}
+# upload_kbps:    request bodies are read no faster than this (0: unlimited)
+# transcribe_rtf: seconds /transcribe spends per second of decoded audio
+DEFAULT_CONFIG = {
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "error_rate": 0.0,
+    "error_status": 500,
+    "endpoint_latency_ms": {},
+    "upload_kbps": 0,
+    "transcribe_rtf": 0.0,
+    "unread_emails": 5,
+    "page_paragraphs": 20,
+    "serper_pages": 5,
+    "seed": None,
+}
+
+
+class FakeScriptyState:
+    """In-memory data shared by all request handlers"""
+
+    def __init__(self, config):
+        self.config = dict(DEFAULT_CONFIG, **config)
+        self.random = random.Random(self.config["seed"])
+        self.lock = threading.Lock()
+        self.events = []
+        self.drafts = []
+        self.sheets = []
+        self.uploads = {}
+        self.requests = {}
+
+    def count(self, path):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def delay(self, path):
+        latency = self.config["endpoint_latency_ms"].get(path, self.config["latency_ms"])
+        with self.lock:
+            jitter = self.random.uniform(0, self.config["jitter_ms"]) if self.config["jitter_ms"] else 0
+        return (latency + jitter) / 1000
+
+    def should_fail(self):
+        if not self.config["error_rate"]:
+            return False
+        with self.lock:
+            return self.random.random() < self.config["error_rate"]
+
+
+# Fake speech: each word is a tone burst; FAKE_WORDS[i] sounds at 200 + 50 * i Hz
+FAKE_WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliett", "kilo", "lima", "mike", "november", "oscar", "papa",
+    "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey", "xray",
+    "yankee", "zulu", "one", "two", "three", "four", "five", "six",
+]
+FAKE_WORD_SECONDS = 0.25
+FAKE_WORD_GAP = 0.1
+
+
+def word_frequency(word):
+    return 200 + 50 * FAKE_WORDS.index(word)
+
+
+def write_fake_speech(path, phrases, samplerate=44100, pause=0.8, channels=2):
+    """
+    Write phrases (lists of FAKE_WORDS) as tone bursts separated by short
+    gaps, with `pause` seconds of near-silence between phrases
+    """
+    rng = np.random.default_rng(0)
+    word = int(FAKE_WORD_SECONDS * samplerate)
+    t = np.arange(word) / samplerate
+    ramp = np.minimum(1, np.minimum(t, t[::-1]) / 0.01)
+    with sf.SoundFile(str(path), "w", samplerate=samplerate, channels=channels) as f:
+        for phrase in phrases:
+            for name in phrase:
+                burst = 0.3 * np.sin(2 * np.pi * word_frequency(name) * t) * ramp
+                gap = np.zeros(int(FAKE_WORD_GAP * samplerate))
+                _write_channels(f, np.concatenate([burst, gap]), rng, channels)
+            _write_channels(f, np.zeros(int(pause * samplerate)), rng, channels)
+
+
+def _write_channels(f, mono, rng, channels):
+    mono = mono + 0.001 * rng.standard_normal(len(mono))
+    f.write(np.repeat(mono[:, None], channels, axis=1).astype(np.float32))
+
+
+def fake_words(mono, samplerate):
+    """Words heard in fake speech: one per voiced run, named by its dominant frequency"""
+    frame = int(samplerate * 0.02)
+    frames = len(mono) // frame
+    rms = np.sqrt((mono[:frames * frame].reshape(frames, frame) ** 2).mean(axis=1))
+    voiced = np.concatenate([[False], rms > 0.02, [False]])
+    edges = np.flatnonzero(voiced[1:] != voiced[:-1])
+    words = []
+    for start, stop in zip(edges[::2], edges[1::2]):
+        # Runs under 60 ms are bursts cut off at the edge of the audio
+        if stop - start < 3:
+            continue
+        burst = mono[start * frame:stop * frame]
+        spectrum = np.abs(np.fft.rfft(burst * np.hanning(len(burst)), n=samplerate))
+        index = int(round((np.argmax(spectrum) - 200) / 50))
+        if 0 <= index < len(FAKE_WORDS):
+            words.append(FAKE_WORDS[index])
+    return words
+
+
+def decode_fake_speech(audio):
+    """(words, duration) for audio soundfile can read, (None, 0) otherwise"""
+    if sf is None:
+        return None, 0
+    try:
+        data, samplerate = sf.read(io.BytesIO(audio), dtype="float32", always_2d=True)
+    except Exception:
+        return None, 0
+    return fake_words(data.mean(axis=1), samplerate), len(data) / samplerate
+
+
+class FakeScriptyHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+    server_version = "FakeScripty/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read(self, size):
+        # Paces reads to upload_kbps so upload size shows up in latency
+        rate = self.state.config["upload_kbps"] * 1000 / 8
+        if not rate:
+            return self.rfile.read(size)
+        data = bytearray()
+        while len(data) < size:
+            block = self.rfile.read(min(64 * 1024, size - len(data)))
+            if not block:
+                break
+            data.extend(block)
+            time.sleep(len(block) / rate)
+        return bytes(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            return self._read(length)
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self._read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        return b""
+
+    def _json_body(self, raw):
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        raw = self._read_body() if method in ("POST", "PUT", "PATCH") else b""
+        self.state.count(path)
+
+        time.sleep(self.state.delay(path))
+        if self.state.should_fail():
+            status = self.state.config["error_status"]
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return self._send_json(status, {"success": False, "error": "Injected failure"}, headers)
+
+        route = ROUTES.get((method, path))
+        if route is None:
+            route = next((handler for route_method, prefix, handler in PREFIX_ROUTES
+                          if route_method == method and path.startswith(prefix)), None)
+        if route is None:
+            return self._send_json(404, {"success": False, "error": f"No route for {method} {path}"})
+        result = route(self, parse_qs(url.query), raw)
+        # Routes that write their own response return None
+        if result is not None:
+            self._send_json(*result)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    # Endpoint implementations return (status, payload)
+
+    def calendar_list(self, query, raw):
+        with self.state.lock:
+            return 200, {"items": list(self.state.events)}
+
+    def calendar_create(self, query, raw):
+        data = self._json_body(raw)
+        if "startTime" not in data:
+            return 400, {"success": False, "error": "startTime is required"}
+        event = {
+            "id": uuid.uuid4().hex,
+            "summary": data.get("summary", ""),
+            "start": {"dateTime": data["startTime"]},
+            "end": {"dateTime": data.get("endTime", data["startTime"])},
+        }
+        with self.state.lock:
+            self.state.events.append(event)
+        return 200, {"success": True, "event": event}
+
+    def email_unread(self, query, raw):
+        now = datetime.now(timezone.utc)
+        emails = []
+        for i in range(self.state.config["unread_emails"]):
+            emails.append({
+                "message_id": f"msg-{i}",
+                "subject": f"Question about project {i}" if i % 2 == 0 else f"Weekly newsletter {i}",
+                "from": f"Sender {i} <sender{i}@example.com>" if i % 2 == 0 else "News <no-reply@example.com>",
+                "to": "me@example.com",
+                "body": f"Hi, can you send me the update for item {i}?",
+                "date": (now - timedelta(hours=i)).isoformat(),
+            })
+        return 200, emails
+
+    def email_draft(self, query, raw):
+        draft = self._json_body(raw)
+        with self.state.lock:
+            self.state.drafts.append(draft)
+        return 200, {"success": True, "draft_id": uuid.uuid4().hex}
+
+    def call(self, query, raw):
+        messages = self._json_body(raw).get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        if "Reply with a JSON array" in prompt:
+            # One verdict per email listed in the classification prompt
+            count = len(re.findall(r"'subject'", prompt))
+            verdicts = [i % 2 == 0 for i in range(count)]
+            return 200, {"content": json.dumps(verdicts)}
+        return 200, {"content": "Hi,\n\nThanks for your email. I'll get back to you with the update shortly.\n\nBest"}
+
+    def _fake_transcript(self, audio):
+        # Audio soundfile can decode is "transcribed" (see fake_words); anything
+        # else gets text that depends only on the bytes, so every upload path agrees
+        words, seconds = decode_fake_speech(audio)
+        if words is None:
+            digest = hashlib.sha1(audio).hexdigest()[:12]
+            return {"success": True, "transcript": f"Fake transcript of {len(audio)} bytes ({digest})."}
+        time.sleep(seconds * self.state.config["transcribe_rtf"])
+        return {"success": True, "transcript": " ".join(words)}
+
+    def transcribe(self, query, raw):
+        match = re.search(r'boundary="?([^";]+)"?', self.headers.get("Content-Type", ""))
+        if not match:
+            return 400, {"success": False, "error": "Expected multipart/form-data"}
+        delimiter = b"--" + match.group(1).encode("ascii")
+        for part in raw.split(delimiter)[1:-1]:
+            headers, _, body = part.partition(b"\r\n\r\n")
+            if b'name="file"' in headers:
+                return 200, self._fake_transcript(body[:-2] if body.endswith(b"\r\n") else body)
+        return 400, {"success": False, "error": "No file part"}
+
+    # Resumable chunked uploads:
+    #   POST /transcribe/uploads {"filename", "size"}     -> {"upload_id", "offset"}
+    #   GET  /transcribe/uploads/<id>                     -> {"upload_id", "offset", "size"}
+    #   PUT  /transcribe/uploads/<id>?offset=N  <bytes>   -> {"offset"}, or 409 with the server offset
+    #   POST /transcribe/uploads/<id>/complete            -> transcript
+
+    def upload_create(self, query, raw):
+        data = self._json_body(raw)
+        if "size" not in data:
+            return 400, {"success": False, "error": "size is required"}
+        upload_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.uploads[upload_id] = {"size": int(data["size"]), "data": bytearray()}
+        return 200, {"upload_id": upload_id, "offset": 0}
+
+    def _upload(self):
+        parts = urlparse(self.path).path.split("/uploads/", 1)[1].split("/")
+        with self.state.lock:
+            return parts[0], self.state.uploads.get(parts[0])
+
+    def upload_status(self, query, raw):
+        upload_id, upload = self._upload()
+        if upload is None:
+            return 404, {"success": False, "error": "Unknown upload"}
+        return 200, {"upload_id": upload_id, "offset": len(upload["data"]), "size": upload["size"]}
+
+    def upload_chunk(self, query, raw):
+        upload_id, upload = self._upload()
+        if upload is None:
+            return 404, {"success": False, "error": "Unknown upload"}
+        offset = int(query.get("offset", ["0"])[0])
+        with self.state.lock:
+            if offset != len(upload["data"]):
+                return 409, {"success": False, "error": "Offset mismatch", "offset": len(upload["data"])}
+            if offset + len(raw) > upload["size"]:
+                return 400, {"success": False, "error": "Chunk past end of upload"}
+            upload["data"].extend(raw)
+            return 200, {"upload_id": upload_id, "offset": len(upload["data"])}
+
+    def upload_complete(self, query, raw):
+        upload_id, upload = self._upload()
+        if upload is None:
+            return 404, {"success": False, "error": "Unknown upload"}
+        if len(upload["data"]) != upload["size"]:
+            return 409, {"success": False, "error": "Upload incomplete", "offset": len(upload["data"])}
+        with self.state.lock:
+            self.state.uploads.pop(upload_id, None)
+        return 200, self._fake_transcript(bytes(upload["data"]))
+
+    def serper_search(self, query, raw):
+        # Serper-shaped results so google_searcher can be pointed here via SERPER_URL.
+        # Pages of 10; the listing ends after serper_pages pages.
+        data = self._json_body(raw)
+        q = data.get("q", "")
+        page = int(data.get("page", 1))
+        slug = re.sub(r"\W+", "-", q.casefold()).strip("-")
+        first = (page - 1) * 10 + 1
+        last = first + 10 if page <= self.state.config["serper_pages"] else first
+        organic = [
+            {
+                "title": f"{q} - result {i}",
+                "link": f"{self.server.root_url}/pages/{slug}/{i}",
+                "snippet": f"Snippet {i} about {q}.",
+                "source": "example.com",
+                "position": i - first + 1,
+            }
+            for i in range(first, last)
+        ]
+        payload = {"searchParameters": {"q": q, "page": page}, "organic": organic}
+        if page == 1:
+            payload["knowledgeGraph"] = {"title": q, "description": f"About {q}", "url": f"{self.server.root_url}/pages/{slug}"}
+        return 200, payload
+
+    def page(self, query, raw):
+        # HTML fixture pages for web_search's fetch_content mode, with ETags
+        slug = urlparse(self.path).path.split("/pages/", 1)[1]
+        etag = '"' + hashlib.sha1(slug.encode("utf-8")).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        topic = html.escape(slug.replace("-", " ").replace("/", " "))
+        paragraphs = "".join(
+            f"<p>Paragraph {i} of the article about {topic}. It has a few sentences of body text.</p>"
+            for i in range(self.state.config["page_paragraphs"])
+        )
+        body = (
+            f"<!doctype html><html><head><title>{topic}</title><style>p {{ color: red }}</style>"
+            f"<script>var tracking = 1;</script></head><body>"
+            f"<nav><a href='/'>Home</a> | <a href='/about'>About</a></nav>"
+            f"<article><h1>{topic}</h1>{paragraphs}</article>"
+            f"<footer>Copyright example.com</footer></body></html>"
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+        return None
+
+    def sheets_job_search(self, query, raw):
+        jobs = self._json_body(raw).get("jobs", [])
+        with self.state.lock:
+            self.state.sheets.append(jobs)
+        return 200, {"success": True, "rows": len(jobs)}
+
+
+ROUTES = {
+    ("GET", "/calendar/events"): FakeScriptyHandler.calendar_list,
+    ("POST", "/calendar/events"): FakeScriptyHandler.calendar_create,
+    ("GET", "/email/unread"): FakeScriptyHandler.email_unread,
+    ("POST", "/email/draft"): FakeScriptyHandler.email_draft,
+    ("POST", "/call"): FakeScriptyHandler.call,
+    ("POST", "/transcribe"): FakeScriptyHandler.transcribe,
+    ("POST", "/sheets/job-search"): FakeScriptyHandler.sheets_job_search,
+    ("POST", "/search"): FakeScriptyHandler.serper_search,
+    ("POST", "/transcribe/uploads"): FakeScriptyHandler.upload_create,
+}
+
+# (method, path prefix, handler), tried in order when no exact route matches
+PREFIX_ROUTES = [
+    ("GET", "/pages/", FakeScriptyHandler.page),
+    ("GET", "/transcribe/uploads/", FakeScriptyHandler.upload_status),
+    ("PUT", "/transcribe/uploads/", FakeScriptyHandler.upload_chunk),
+    ("POST", "/transcribe/uploads/", FakeScriptyHandler.upload_complete),
+]
+
+
+class FakeScriptyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config=None):
+        super().__init__(address, FakeScriptyHandler)
+        self.state = FakeScriptyState(config or {})
+
+    @property
+    def root_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        return self.root_url + API_PREFIX
+
+
+def start_server(host="127.0.0.1", port=0, **config):
+    """Start a stand-in server on a background thread; port=0 picks a free port"""
+    server = FakeScriptyServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, name="fake-scripty-server", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the scripty.me assistant API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--endpoint-latency", action="append", default=[], metavar="PATH=MS",
+                        help="Per-endpoint latency, e.g. /transcribe=2000")
+    parser.add_argument("--upload-kbps", type=float, default=0, help="Simulated upload bandwidth (0: unlimited)")
+    parser.add_argument("--transcribe-rtf", type=float, default=0,
+                        help="Seconds of /transcribe latency per second of audio")
+    parser.add_argument("--unread-emails", type=int, default=5)
+    parser.add_argument("--seed", type=int)
+    options = parser.parse_args()
+
+    endpoint_latency = {}
+    for item in options.endpoint_latency:
+        path, _, ms = item.partition("=")
+        endpoint_latency[path] = float(ms)
+
+    server = FakeScriptyServer((options.host, options.port), {
+        "latency_ms": options.latency_ms,
+        "jitter_ms": options.jitter_ms,
+        "error_rate": options.error_rate,
+        "error_status": options.error_status,
+        "endpoint_latency_ms": endpoint_latency,
+        "upload_kbps": options.upload_kbps,
+        "transcribe_rtf": options.transcribe_rtf,
+        "unread_emails": options.unread_emails,
+        "seed": options.seed,
+    })
+    print(f"Fake scripty.me API listening on {server.base_url}")
+    print(f"Point the tools at it with SCRIPTY_API_URL={server.base_url}")
+    print(f"and SERPER_URL={server.root_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
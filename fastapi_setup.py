@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -62,7 +65,7 @@ def modify_css(path):
     with open(os.path.join(path, 'src', 'index.css'), 'w') as f:
         f.write(css_content)
 
-def setup_fastapi_react(folder_name="fastapi-react-app"):
+async def setup_fastapi_react(folder_name="fastapi-react-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -193,7 +196,7 @@ python-dotenv>=1.0.0"""
         
         for cmd in frontend_commands:
             print(f"\nExecuting: {cmd}")
-            if not run_command(cmd, cwd=frontend_path):
+            if not await run_blocking(run_command, cmd, cwd=frontend_path):
                 return False
 
         # Use helper functions
@@ -312,7 +315,7 @@ async def func(args):
         path = args.get("path", os.path.expanduser("~"))
         folder_name = args.get("folder_name", "fastapi_project")
         
-        if setup_fastapi_react(folder_name):
+        if await setup_fastapi_react(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"FastAPI + React project created successfully in {folder_name}"
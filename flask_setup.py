@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -62,7 +65,7 @@ def modify_css(path):
     with open(os.path.join(path, 'src', 'index.css'), 'w') as f:
         f.write(css_content)
 
-def setup_flask_ts(folder_name="flask-ts-app"):
+async def setup_flask_ts(folder_name="flask-ts-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -234,7 +237,7 @@ marshmallow>=3.20.0"""
         ]
         
         for cmd in frontend_commands:
-            if not run_command(cmd, cwd=frontend_path):
+            if not await run_blocking(run_command, cmd, cwd=frontend_path):
                 print(f"Failed to execute: {cmd}")  # Keep this critical error logging
                 return False
         
@@ -349,7 +352,7 @@ async def func(args):
                 "error": "Folder name is required"
             })
             
-        if setup_flask_ts(folder_name):
+        if await setup_flask_ts(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"Flask + React project created successfully in {folder_name}"
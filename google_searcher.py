@@ -1,41 +1,152 @@
 import requests
 import logging
 import time
-import json
 import sys
 import asyncio
-import http.client
+import os
+from collections import OrderedDict
+import page_content
+import search_cache
+import serper_client
+from tool_executor import SingleFlight
+from tool_tracing import traced
 
 logging.basicConfig(level=logging.INFO)
 
-async def search_with_serper(query):
+# How many searches of one multi-query call may be in flight at once
+SEARCH_PARALLELISM = int(os.environ.get("SCRIPTY_SEARCH_PARALLELISM", "4"))
+# How many organic results fetch_content reads by default
+CONTENT_RESULTS = int(os.environ.get("SCRIPTY_SEARCH_CONTENT_RESULTS", "3"))
+
+# Organic results per page unless num_results says otherwise
+DEFAULT_NUM_RESULTS = 3
+MAX_NUM_RESULTS = 100
+# Serper returns organic results in pages of this size; a larger or
+# offset window is assembled from several of them
+SERPER_PAGE_SIZE = 10
+
+# Fields a caller can ask for with `fields`
+RESULT_FIELDS = ("type", "title", "url", "snippet", "source", "position", "description", "answer", "queries")
+# Added by fetch_content; always kept when present
+CONTENT_FIELDS = ("content", "content_truncated", "content_error")
+
+# Identical searches already in flight are shared rather than sent again
+in_flight_searches = SingleFlight()
+
+# Last page requested per (normalized query, num_results), to spot sequential paging
+PAGE_HISTORY_SIZE = 256
+page_history = OrderedDict()
+prefetch_tasks = set()
+prefetch_stats = {"scheduled": 0, "failed": 0}
+
+def block_params(block):
+    # Block 1 is the plain query, so it shares cache entries with older calls
+    return {"page": block} if block > 1 else {}
+
+async def request_and_store(query, cache, params):
+    result = await serper_client.search_async(query, **params)
+    if cache is not None:
+        cache.set(query, result, **params)
+    return result
+
+async def request_block(query, block, cache):
+    key = (search_cache.normalize_query(query), block)
+    return await in_flight_searches.do(key, request_and_store, query, cache, block_params(block))
+
+async def fetch_serper(query, block=1):
+    """
+    Raw Serper response for one page (`block`) of a query, served from the
+    search cache when a normalized match is fresh, or shared with an
+    identical search already in flight.
+    Returns (response, origin): "cache", "coalesced" or "api".
+    """
+    cache = search_cache.get_cache()
+    if cache is not None:
+        result = cache.get(query, **block_params(block))
+        if result is not None:
+            return result, "cache"
+    result, shared = await request_block(query, block, cache)
+    return result, "coalesced" if shared else "api"
+
+def blocks_for(num_results, page):
+    """Serper pages covering organic results [(page-1)*n, page*n)"""
+    start = (page - 1) * num_results
+    return range(start // SERPER_PAGE_SIZE + 1, (start + num_results - 1) // SERPER_PAGE_SIZE + 2)
+
+async def prefetch_block(query, block, cache):
+    try:
+        await request_block(query, block, cache)
+    except Exception as e:
+        prefetch_stats["failed"] += 1
+        logging.info(f"Prefetch of page {block} for {query!r} failed: {str(e)}")
+
+def schedule_prefetch(query, num_results, page):
+    """
+    When a caller asks for the page after the one they asked for last, start
+    loading the following page into the search cache in the background.
+    """
+    cache = search_cache.get_cache()
+    key = (search_cache.normalize_query(query), num_results)
+    previous = page_history.pop(key, None)
+    page_history[key] = page
+    if len(page_history) > PAGE_HISTORY_SIZE:
+        page_history.popitem(last=False)
+    if cache is None or previous != page - 1:
+        return False
+
+    scheduled = False
+    for block in blocks_for(num_results, page + 1):
+        if cache.contains(query, **block_params(block)):
+            continue
+        task = asyncio.ensure_future(prefetch_block(query, block, cache))
+        prefetch_tasks.add(task)
+        task.add_done_callback(prefetch_tasks.discard)
+        prefetch_stats["scheduled"] += 1
+        scheduled = True
+    return scheduled
+
+def next_block_has_results(query, block, response):
+    """
+    Whether Serper has organic results after `block`, without waiting on a
+    request for the next block: its cached copy when there is one (the
+    prefetch puts it there), otherwise a full block is taken to mean more.
+    """
+    cache = search_cache.get_cache()
+    if cache is not None and cache.contains(query, **block_params(block + 1)):
+        return bool(cache.get(query, **block_params(block + 1)).get("organic"))
+    return len(response.get("organic", [])) >= SERPER_PAGE_SIZE
+
+def project(search_results, fields):
+    """Keep only the requested fields of each result"""
+    keep = set(fields) | set(CONTENT_FIELDS)
+    return [{key: value for key, value in item.items() if key in keep} for item in search_results]
+
+def parse_fields(fields):
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return [field.strip() for field in fields or [] if field.strip() in RESULT_FIELDS]
+
+def coalescing_stats(**extra):
+    return {**extra, **in_flight_searches.stats}
+
+@traced("serper.search", capture=("query", "num_results", "page"))
+async def search_with_serper(query, num_results=DEFAULT_NUM_RESULTS, page=1):
     """
     Uses the Serper API to get Google search results in a clean JSON format.
+    Returns organic results at positions [(page-1)*num_results+1, page*num_results],
+    plus the knowledge graph and answer box on the first page. Positions count
+    Serper's blocks as SERPER_PAGE_SIZE slots each, so a block that comes back
+    short leaves a gap instead of shifting every later result. has_more is
+    exact when a result past the page was fetched, and otherwise comes from
+    next_block_has_results.
+    Returns (results, origin, has_more); results is an error string on failure.
     """
     try:
-        # Connect to the Serper API
-        conn = http.client.HTTPSConnection("google.serper.dev")
-        
-        # Prepare the payload with the query
-        payload = json.dumps({
-            "q": query
-        })
-        
-        # Set headers including the API key
-        headers = {
-            'X-API-KEY': '0cde2022efed535909470fc4df4fb8e23985f9a9',
-            'Content-Type': 'application/json'
-        }
-        
-        # Make the request
-        conn.request("POST", "/search", payload, headers)
-        
-        # Get the response
-        response = conn.getresponse()
-        data = response.read()
-        
-        # Parse the JSON response
-        result = json.loads(data.decode("utf-8"))
+        blocks = blocks_for(num_results, page)
+        fetched = await asyncio.gather(*[fetch_serper(query, block) for block in blocks])
+        origins = {origin for _, origin in fetched}
+        origin = "api" if "api" in origins else "coalesced" if "coalesced" in origins else "cache"
+        result = fetched[0][0] if page == 1 else {}
         
         search_results = []
         
@@ -62,44 +173,187 @@ async def search_with_serper(query):
                 'url': answer_box.get('link', '')
             })
         
-        # Extract top organic results
-        if "organic" in result:
-            for index, item in enumerate(result["organic"][:3]):  # Get top 3 organic results
-                search_results.append({
-                    'type': 'organic',
-                    'position': index + 1,
-                    'title': item.get('title', ''),
-                    'snippet': item.get('snippet', ''),
-                    'source': item.get('source', ''),
-                    'url': item.get('link', '')
-                })
+        # Extract the requested window of organic results
+        first, last = (page - 1) * num_results + 1, page * num_results
+        organic = []
+        for block, (response, _) in zip(blocks, fetched):
+            for index, item in enumerate(response.get("organic", [])[:SERPER_PAGE_SIZE]):
+                organic.append(((block - 1) * SERPER_PAGE_SIZE + index + 1, item))
+        has_more = (any(position > last for position, _ in organic)
+                    or next_block_has_results(query, blocks[-1], fetched[-1][0]))
+        for position, item in organic:
+            if not first <= position <= last:
+                continue
+            search_results.append({
+                'type': 'organic',
+                'position': position,
+                'title': item.get('title', ''),
+                'snippet': item.get('snippet', ''),
+                'source': item.get('source', ''),
+                'url': item.get('link', '')
+            })
         
-        return search_results
+        schedule_prefetch(query, num_results, page)
+        return search_results, origin, has_more
     
     except Exception as e:
-        return f"Error: {str(e)}"
+        return f"Error: {str(e)}", "api", False
+
+def result_key(item):
+    """Identity used to drop the same hit returned for several queries"""
+    url = item.get('url', '').strip()
+    if url:
+        return url.rstrip('/')
+    # Answer boxes often have no link; fall back to their content
+    return (item['type'], item.get('title', ''), item.get('answer', ''), item.get('snippet', ''))
+
+def unique_queries(queries):
+    """Drop blank queries and ones that normalize to an earlier query"""
+    seen = set()
+    unique = []
+    for query in queries:
+        normalized = search_cache.normalize_query(str(query))
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            unique.append(str(query).strip())
+    return unique
+
+@traced("serper.search_many")
+async def search_many(queries, parallelism=SEARCH_PARALLELISM, num_results=DEFAULT_NUM_RESULTS, page=1):
+    """
+    Run several searches concurrently (at most `parallelism` at a time) and
+    merge them in query order. Each result lists the queries that returned it.
+    Returns (results, errors by query, count of queries per origin, has_more).
+    """
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+
+    async def run(query):
+        async with semaphore:
+            return await search_with_serper(query, num_results, page)
+
+    outcomes = await asyncio.gather(*[run(query) for query in queries])
+
+    merged = {}
+    errors = {}
+    origins = {"cache": 0, "coalesced": 0, "api": 0}
+    has_more = False
+    for query, (search_results, origin, more) in zip(queries, outcomes):
+        if not isinstance(search_results, list):
+            errors[query] = search_results
+            continue
+        origins[origin] += 1
+        has_more = has_more or more
+        for item in search_results:
+            key = result_key(item)
+            if key in merged:
+                merged[key]['queries'].append(query)
+            else:
+                merged[key] = dict(item, queries=[query])
+    return list(merged.values()), errors, origins, has_more
+
+@traced("page.fetch_results")
+async def attach_content(search_results, limit, max_bytes=None):
+    """
+    Download the pages behind the first `limit` organic results concurrently
+    and add their extracted text to each result in place.
+    """
+    targets = [item for item in search_results if item['type'] == 'organic' and item.get('url')][:limit]
+    pages = await page_content.fetch_pages([item['url'] for item in targets], max_bytes=max_bytes)
+    summary = {"fetched": 0, "cached": 0, "failed": 0}
+    for item, page in zip(targets, pages):
+        if "error" in page:
+            item['content_error'] = page['error']
+            summary["failed"] += 1
+            continue
+        item['content'] = page['content']
+        item['content_truncated'] = page['truncated']
+        summary["fetched"] += 1
+        summary["cached"] += page['cached']
+    return summary
 
 async def func(args):
     try:
         search_query = args.get('query')
-        if not search_query:
-            return json.dumps({"error": "No search query provided"})
+        queries = args.get('queries')
+        if queries:
+            if isinstance(queries, str):
+                queries = [queries]
+            results = await multi_search(([search_query] if search_query else []) + list(queries), args)
+        elif not search_query:
+            return {"error": "No search query provided"}
+        else:
+            results = await single_search(search_query, args)
 
-        results = {
-            "message": f"Search results for: {search_query}",
-            "results": []
-        }
+        if args.get('fetch_content') and results.get('results'):
+            limit = int(args.get('content_results') or CONTENT_RESULTS)
+            max_bytes = args.get('max_page_bytes')
+            results["content"] = await attach_content(results['results'], limit, int(max_bytes) if max_bytes else None)
 
-        search_results = await search_with_serper(search_query)
-        if isinstance(search_results, list):
-            results["results"] = search_results
-        else:
-            results["error"] = search_results
+        fields = parse_fields(args.get('fields'))
+        if fields and results.get('results'):
+            results["results"] = project(results['results'], fields)
 
-        return json.dumps(results)
+        return results
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
+
+def paging_args(args):
+    num_results = min(MAX_NUM_RESULTS, max(1, int(args.get('num_results') or DEFAULT_NUM_RESULTS)))
+    page = max(1, int(args.get('page') or 1))
+    return num_results, page
+
+def add_paging(results, page, has_more):
+    results["page"] = page
+    if has_more:
+        results["next_page"] = page + 1
+
+async def single_search(search_query, args):
+    num_results, page = paging_args(args)
+    results = {
+        "message": f"Search results for: {search_query}",
+        "results": []
+    }
+
+    search_results, origin, has_more = await search_with_serper(search_query, num_results, page)
+    if isinstance(search_results, list):
+        results["results"] = search_results
+        add_paging(results, page, has_more)
+    else:
+        results["error"] = search_results
+
+    cache = search_cache.get_cache()
+    if cache is not None:
+        results["cache"] = {"hit": origin == "cache", **cache.snapshot()}
+    results["coalescing"] = coalescing_stats(shared=origin == "coalesced")
+    results["backend"] = serper_client.stats()
+    return results
+
+async def multi_search(queries, args):
+    queries = unique_queries(queries)
+    if not queries:
+        return {"error": "No search query provided"}
+
+    parallelism = int(args.get('max_parallel') or SEARCH_PARALLELISM)
+    num_results, page = paging_args(args)
+    search_results, errors, origins, has_more = await search_many(queries, parallelism, num_results, page)
+    results = {
+        "message": f"Search results for: {'; '.join(queries)}",
+        "queries": queries,
+        "results": search_results
+    }
+    add_paging(results, page, has_more)
+    if errors:
+        results["errors"] = errors
+        if len(errors) == len(queries):
+            results["error"] = "All searches failed"
+
+    cache = search_cache.get_cache()
+    if cache is not None:
+        results["cache"] = {"cached_queries": origins["cache"], **cache.snapshot()}
+    results["coalescing"] = coalescing_stats(shared_queries=origins["coalesced"])
+    results["backend"] = serper_client.stats()
+    return results
 
 object = {
     "name": "web_search",
@@ -110,8 +364,41 @@ object = {
             "query": {
                 "type": "string",
                 "description": "The search query to look up"
+            },
+            "queries": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Several queries to search at once (instead of or in addition to query). Results are merged, duplicate URLs are dropped and each result lists the queries that found it"
+            },
+            "max_parallel": {
+                "type": "integer",
+                "description": "Maximum searches in flight at once for queries (optional, defaults to 4)"
+            },
+            "num_results": {
+                "type": "integer",
+                "description": "Organic results per page (optional, defaults to 3, at most 100)"
+            },
+            "page": {
+                "type": "integer",
+                "description": "Which page of num_results organic results to return, starting at 1 (optional). The result's next_page says whether more are likely"
+            },
+            "fields": {
+                "type": "array",
+                "items": {"type": "string", "enum": ["type", "title", "url", "snippet", "source", "position", "description", "answer", "queries"]},
+                "description": "Only return these fields of each result, e.g. [\"title\", \"url\", \"snippet\"] (optional, defaults to all)"
+            },
+            "fetch_content": {
+                "type": "boolean",
+                "description": "Also download the top organic results and include their main text as 'content' (optional, defaults to false)"
+            },
+            "content_results": {
+                "type": "integer",
+                "description": "How many organic results to read when fetch_content is true (optional, defaults to 3)"
+            },
+            "max_page_bytes": {
+                "type": "integer",
+                "description": "Stop downloading a page after this many bytes when fetch_content is true (optional, defaults to 512 KB)"
             }
-        },
-        "required": ["query"]
+        }
     }
 }
@@ -3,6 +3,8 @@ import json
 import os
 from PIL import Image
 import glob
+from tool_executor import run_blocking
+from tool_tracing import span, traced
 
 SUPPORTED_FORMATS = {
     'PNG': 'PNG',
@@ -20,6 +22,7 @@ def validate_format(format_str):
         raise ValueError(f"Unsupported format: {format_str}. Supported formats: {', '.join(SUPPORTED_FORMATS.keys())}")
     return SUPPORTED_FORMATS[format_upper]
 
+@traced("file_walk", capture=("filename",))
 def find_single_file(filename):
     search_paths = [
         os.getcwd(),
@@ -37,6 +40,7 @@ def find_single_file(filename):
             continue
     return []
 
+@traced("file_glob", capture=("folder_path", "pattern"))
 def find_batch_files(folder_path, pattern):
     try:
         full_pattern = os.path.join(folder_path, pattern)
@@ -44,6 +48,34 @@ def find_batch_files(folder_path, pattern):
     except Exception as e:
         raise ValueError(f"Error searching folder {folder_path}: {str(e)}")
 
+def convert_images(locations, output_format):
+    converted = []
+    errors = []
+    original_files = []
+
+    for input_path in locations:
+        try:
+            with Image.open(input_path) as img:
+                original_format = img.format
+                if original_format not in SUPPORTED_FORMATS.values():
+                    errors.append(f"Skipped {input_path}: Format {original_format} not supported")
+                    continue
+
+                output_path = os.path.splitext(input_path)[0] + '.' + output_format.lower()
+                with span("pil.encode", path=input_path, format=output_format):
+                    if output_format == 'JPEG':
+                        img = img.convert('RGB')
+                    img.save(output_path, output_format)
+                converted.append(os.path.basename(input_path))
+                original_files.append(input_path)
+
+        except Image.UnidentifiedImageError:
+            errors.append(f"Skipped {input_path}: Could not identify image format")
+        except Exception as e:
+            errors.append(f"Failed {input_path}: {str(e)}")
+
+    return converted, errors, original_files
+
 def cleanup_files(files):
     for file in files:
         try:
@@ -69,9 +101,9 @@ async def func(args):
                 return json.dumps({"error": "Folder path required for batch conversion"})
             if not os.path.exists(folder_path):
                 return json.dumps({"error": f"Folder not found: {folder_path}"})
-            locations = find_batch_files(folder_path, filename)
+            locations = await run_blocking(find_batch_files, folder_path, filename)
         else:
-            locations = find_single_file(filename)
+            locations = await run_blocking(find_single_file, filename)
             
         if not locations:
             return json.dumps({"error": f"No files found matching {filename}"})
@@ -86,29 +118,7 @@ async def func(args):
                 }
             })
         
-        converted = []
-        errors = []
-        original_files = []
-        
-        for input_path in locations:
-            try:
-                with Image.open(input_path) as img:
-                    original_format = img.format
-                    if original_format not in SUPPORTED_FORMATS.values():
-                        errors.append(f"Skipped {input_path}: Format {original_format} not supported")
-                        continue
-                        
-                    output_path = os.path.splitext(input_path)[0] + '.' + output_format.lower()
-                    if output_format == 'JPEG':
-                        img = img.convert('RGB')
-                    img.save(output_path, output_format)
-                    converted.append(os.path.basename(input_path))
-                    original_files.append(input_path)
-                    
-            except Image.UnidentifiedImageError:
-                errors.append(f"Skipped {input_path}: Could not identify image format")
-            except Exception as e:
-                errors.append(f"Failed {input_path}: {str(e)}")
+        converted, errors, original_files = await run_blocking(convert_images, locations, output_format)
 
         if converted:
             return json.dumps({
@@ -5,7 +5,9 @@ import os
 import hashlib
 import json
 from pathlib import Path
-import requests
+from tool_executor import run_blocking
+import scripty_client
+from tool_tracing import span, traced
 
 def get_base_directory():
     """Get the base directory in user's home folder"""
@@ -26,6 +28,16 @@ def save_description(description, descriptions_dir):
     
     return desc_id
 
+def run_scrape_jobs(**kwargs):
+    """
+    scrape_jobs, or through the call_library hook when the host injects one
+    with the tool globals (load_test passes cassette.call to record or replay it)
+    """
+    call_library = globals().get("call_library")
+    if call_library is None:
+        return scrape_jobs(**kwargs)
+    return call_library("jobspy.scrape_jobs", scrape_jobs, **kwargs)
+
 def format_salary(row):
     """Format salary from min/max amounts into readable string"""
     try:
@@ -46,14 +58,10 @@ def format_salary(row):
     except:
         return 'Not specified'
 
-def export_to_sheets(jobs_data, authtoken):
+@traced("sheets.export")
+async def export_to_sheets(jobs_data, authtoken):
     """Export jobs data to Google Sheets"""
     try:
-        headers = {
-            "Authorization": f"Bearer {authtoken}",
-            "Content-Type": "application/json"
-        }
-        
         # Convert all values to strings to ensure JSON compatibility
         safe_jobs_data = []
         for job in jobs_data:
@@ -70,9 +78,9 @@ def export_to_sheets(jobs_data, authtoken):
             "jobs": safe_jobs_data
         }
         
-        response = requests.post(
-            "https://scripty.me/api/assistant/sheets/job-search",
-            headers=headers,
+        response = await scripty_client.post(
+            "/sheets/job-search",
+            authtoken,
             json=data
         )
         response.raise_for_status()
@@ -95,77 +103,74 @@ def search_jobs(job_title, location):
         google_search_term = f"{job_title} jobs in {city}"
 
         print(f"Searching for {job_title} jobs in {location}...")
-        jobs = scrape_jobs(
-            site_name=["indeed", "linkedin", "zip_recruiter", "glassdoor", "google"],
-            search_term=search_term,
-            location=location,
-            google_search_term=google_search_term,
-            country_indeed=country,
-            results_wanted=100,
-            hours_old=72,
-            description_format="markdown",
-            fetch_full_description=True,
-            return_as_df=True,
-            delay=[2, 5],
-            random_headers=True
-        )
-        
-        # Convert jobs DataFrame to records and back to ensure numpy arrays are converted
-        jobs_records = jobs.to_dict('records')
-        filtered_jobs = pd.DataFrame(jobs_records)
-        
-        # Convert date_posted to string format, handling both datetime and string inputs
-        if 'date_posted' in filtered_jobs.columns:
-            filtered_jobs['date_posted'] = pd.to_datetime(filtered_jobs['date_posted']).dt.strftime('%Y-%m-%d')
-        
-        filtered_jobs['salary'] = filtered_jobs.apply(format_salary, axis=1)
-        filtered_jobs['status'] = 'Not Applied'
-        
-        relevant_columns = [
-            'title', 'company', 'location', 'date_posted', 'job_type',
-            'is_remote', 'company_industry', 'job_url', 'salary', 'status'
-        ]
-        
-        existing_columns = [col for col in relevant_columns if col in filtered_jobs.columns]
-        filtered_jobs = filtered_jobs[existing_columns]
-        
-        filtered_jobs = filtered_jobs.drop_duplicates(
-            subset=['title', 'company', 'job_url'], 
-            keep='first'
-        )
-        
-        if 'date_posted' in filtered_jobs.columns:
-            filtered_jobs = filtered_jobs.sort_values('date_posted', ascending=False)
-        
-        csv_path = os.path.join(search_dir, "jobs.csv")
-        filtered_jobs.to_csv(csv_path, index=False)
-        
-        metadata = {
-            'timestamp': timestamp,
-            'total_jobs': len(filtered_jobs),
-            'search_term': search_term,
-            'location': location,
-            'date_range': '3 days'
-        }
-        with open(os.path.join(search_dir, "metadata.json"), 'w') as f:
-            json.dump(metadata, f, indent=2)
+        with span("jobspy.scrape", search_term=search_term, location=location):
+            jobs = run_scrape_jobs(
+                site_name=["indeed", "linkedin", "zip_recruiter", "glassdoor", "google"],
+                search_term=search_term,
+                location=location,
+                google_search_term=google_search_term,
+                country_indeed=country,
+                results_wanted=100,
+                hours_old=72,
+                description_format="markdown",
+                fetch_full_description=True,
+                return_as_df=True,
+                delay=[2, 5],
+                random_headers=True
+            )
+        
+        with span("pandas.transform"):
+            # Convert jobs DataFrame to records and back to ensure numpy arrays are converted
+            jobs_records = jobs.to_dict('records')
+            filtered_jobs = pd.DataFrame(jobs_records)
+        
+            # Convert date_posted to string format, handling both datetime and string inputs
+            if 'date_posted' in filtered_jobs.columns:
+                filtered_jobs['date_posted'] = pd.to_datetime(filtered_jobs['date_posted']).dt.strftime('%Y-%m-%d')
+        
+            filtered_jobs['salary'] = filtered_jobs.apply(format_salary, axis=1)
+            filtered_jobs['status'] = 'Not Applied'
+        
+            relevant_columns = [
+                'title', 'company', 'location', 'date_posted', 'job_type',
+                'is_remote', 'company_industry', 'job_url', 'salary', 'status'
+            ]
+        
+            existing_columns = [col for col in relevant_columns if col in filtered_jobs.columns]
+            filtered_jobs = filtered_jobs[existing_columns]
+        
+            filtered_jobs = filtered_jobs.drop_duplicates(
+                subset=['title', 'company', 'job_url'], 
+                keep='first'
+            )
+        
+            if 'date_posted' in filtered_jobs.columns:
+                filtered_jobs = filtered_jobs.sort_values('date_posted', ascending=False)
+        
+        with span("file.write", path=search_dir):
+            csv_path = os.path.join(search_dir, "jobs.csv")
+            filtered_jobs.to_csv(csv_path, index=False)
+        
+            metadata = {
+                'timestamp': timestamp,
+                'total_jobs': len(filtered_jobs),
+                'search_term': search_term,
+                'location': location,
+                'date_range': '3 days'
+            }
+            with open(os.path.join(search_dir, "metadata.json"), 'w') as f:
+                json.dump(metadata, f, indent=2)
 
         results = filtered_jobs.to_dict('records')
         
-        # Export to sheets and prepare final message
-        sheets_result = export_to_sheets(results, authtoken)
-        sheets_status = "Successfully exported to Google Sheets" if sheets_result.get("success", False) else "Failed to export to Google Sheets"
-        
         print(f"\nFound {len(filtered_jobs)} jobs")
         print(f"Results saved to: {csv_path}")
-        print(sheets_status)
         
         result = {
             "success": True,
             "jobs_found": len(filtered_jobs),
             "save_location": search_dir,
-            "results": results,
-            "sheets_export": sheets_result
+            "results": results
         }
             
         return result
@@ -204,22 +209,30 @@ async def func(args):
     """Handler function for the API"""
     try:
         if not args.get("job_title"):
-            return json.dumps({
+            return {
                 "success": False,
                 "error": "Job title is required"
-            })
+            }
             
         if not args.get("location"):
-            return json.dumps({
+            return {
                 "success": False,
                 "error": "Location is required"
-            })
+            }
             
-        result = search_jobs(args["job_title"], args["location"])
-        return json.dumps(result)
+        result = await run_blocking(search_jobs, args["job_title"], args["location"])
+        
+        # Export to sheets back on the event loop so it shares the pooled client
+        if result.get("success"):
+            sheets_result = await export_to_sheets(result["results"], authtoken)
+            sheets_status = "Successfully exported to Google Sheets" if sheets_result.get("success", False) else "Failed to export to Google Sheets"
+            print(sheets_status)
+            result["sheets_export"] = sheets_result
+        
+        return result
         
     except Exception as e:
-        return json.dumps({
+        return {
             "success": False,
             "error": str(e)
-        })
+        }
@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import cassette
+import scripty_client
+import search_cache
+import serper_client
+from fake_scripty_server import start_server
+from tool_cache import is_error_result
+from tool_registry import ToolRegistry, SCRIPTS_DIR
+from tool_tracing import percentile
+
+# Used when no --corpus is given; "{audio_file}" is replaced with a generated recording
+DEFAULT_CORPUS = [
+    {"tool": "calendar_manager", "args": {"action": "get_events"}},
+    {"tool": "calendar_manager", "args": {"action": "get_free_slots", "start_date": "today", "end_date": "tomorrow"}},
+    {"tool": "calendar_manager", "args": {"action": "create_event", "summary": "Load test", "start_time": "15:00"}},
+    {"tool": "email_draft_manager", "args": {"days": 1}},
+    {"tool": "audio_transcriber", "args": {"audio_path": "{audio_file}"}},
+    {"tool": "web_search", "args": {"query": "python asyncio"}},
+]
+
+
+def load_corpus(path):
+    """Read one {"tool": ..., "args": {...}} call per line"""
+    calls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                call = json.loads(line)
+                calls.append({"tool": call["tool"], "args": call.get("args", {})})
+    return calls
+
+
+def _fill_placeholders(calls, replacements):
+    filled = []
+    for call in calls:
+        args = {
+            key: replacements.get(value, value) if isinstance(value, str) else value
+            for key, value in call["args"].items()
+        }
+        filled.append({"tool": call["tool"], "args": args})
+    return filled
+
+
+async def replay(registry, calls, concurrency, total=None, duration=None):
+    """
+    Replay calls (cycling through the corpus) from `concurrency` concurrent
+    clients until `total` calls are done or `duration` seconds have passed.
+    Returns a list of (tool, seconds, ok) samples and the wall time.
+    """
+    source = itertools.cycle(calls)
+    if total is not None:
+        source = itertools.islice(source, total)
+    deadline = time.perf_counter() + duration if duration else None
+    samples = []
+
+    async def client():
+        for call in source:
+            if deadline and time.perf_counter() >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                result = await registry.call(call["tool"], call["args"])
+                ok = not is_error_result(result)
+            except Exception:
+                ok = False
+            samples.append((call["tool"], time.perf_counter() - started, ok))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return samples, time.perf_counter() - started
+
+
+def build_report(samples, wall_time, concurrency):
+    by_tool = {}
+    for tool, seconds, ok in samples:
+        by_tool.setdefault(tool, []).append((seconds, ok))
+
+    def stats(entries):
+        durations = sorted(seconds * 1000 for seconds, _ in entries)
+        return {
+            "count": len(entries),
+            "errors": sum(1 for _, ok in entries if not ok),
+            "throughput_per_s": round(len(entries) / wall_time, 2) if wall_time else None,
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "p99_ms": round(percentile(durations, 99), 2),
+            "max_ms": round(durations[-1], 2),
+        }
+
+    return {
+        "concurrency": concurrency,
+        "wall_time_s": round(wall_time, 3),
+        "total": stats([(seconds, ok) for _, seconds, ok in samples]) if samples else {},
+        "tools": {tool: stats(entries) for tool, entries in sorted(by_tool.items())},
+    }
+
+
+def print_report(report):
+    print(f"Concurrency {report['concurrency']}, wall time {report['wall_time_s']}s")
+    header = f"{'tool':<24}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["tools"].items())
+    if report["total"]:
+        rows.append(("TOTAL", report["total"]))
+    for tool, row in rows:
+        print(f"{tool:<24}{row['count']:>8}{row['errors']:>8}{row['throughput_per_s']:>10}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+
+
+async def run_load_test(calls, concurrency, total=None, duration=None, base_url=None, server_options=None, warmup=True):
+    server = None
+    if base_url is None:
+        server = start_server(**(server_options or {}))
+        base_url = server.base_url
+        serper_client.configure(url=server.root_url)
+    scripty_client.configure(base_url=base_url)
+
+    # No response or search cache: every call should reach the backend
+    search_cache.configure(enabled=False)
+    registry = ToolRegistry(SCRIPTS_DIR, cache_path=None, globals={"authtoken": "load-test", "call_library": cassette.call}, response_cache=False)
+    try:
+        if warmup:
+            # Import each tool and open connections before timing anything
+            for tool in {call["tool"] for call in calls}:
+                await registry.call(tool, next(call["args"] for call in calls if call["tool"] == tool))
+        samples, wall_time = await replay(registry, calls, concurrency, total=total, duration=duration)
+    finally:
+        await scripty_client.aclose()
+        serper_client.close()
+        if server:
+            server.shutdown()
+            server.server_close()
+    return build_report(samples, wall_time, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay tool calls against the scripty.me API (or a local stand-in)")
+    parser.add_argument("--corpus", help="JSON-lines file of {\"tool\": ..., \"args\": {...}} calls")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, help="Total calls to make (default: 20 per corpus entry)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a fixed count")
+    parser.add_argument("--base-url", help="Use this API instead of starting the local fake server "
+                                           "(web_search then goes to SERPER_URL)")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Fake server latency")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="Fake server latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake server error injection rate")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--record", metavar="CASSETTE", help="Record every backend exchange to this cassette")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Replay backend exchanges from this cassette instead of the network")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiply recorded latencies on --replay (0 replays instantly)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        audio_file = Path(temp_dir) / "load_test.wav"
+        audio_file.write_bytes(b"RIFF" + b"\0" * 64 * 1024)
+        calls = load_corpus(options.corpus) if options.corpus else DEFAULT_CORPUS
+        calls = _fill_placeholders(calls, {"{audio_file}": str(audio_file)})
+
+        total = options.requests
+        if total is None and options.duration is None:
+            total = 20 * len(calls)
+        if options.replay:
+            recording = cassette.use(options.replay, "replay", options.latency_scale)
+        elif options.record:
+            recording = cassette.use(options.record, "record")
+        else:
+            recording = contextlib.nullcontext()
+        with recording as tape:
+            report = asyncio.run(run_load_test(
+                calls,
+                max(1, options.concurrency),
+                total=total,
+                duration=options.duration,
+                base_url=options.base_url,
+                server_options={
+                    "latency_ms": options.latency_ms,
+                    "jitter_ms": options.jitter_ms,
+                    "error_rate": options.error_rate,
+                    "error_status": options.error_status,
+                },
+            ))
+
+    print_report(report)
+    if tape is not None:
+        print(f"Cassette {tape.path}: {tape.stats}")
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Load test report saved to: {options.output}")
+
+
+if __name__ == "__main__":
+    main()
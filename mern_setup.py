@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -62,7 +65,7 @@ def create_postcss_config(path):
     with open(os.path.join(path, 'postcss.config.js'), 'w') as f:
         f.write(config_content)
 
-def setup_mern(folder_name="mern-stack-app"):
+async def setup_mern(folder_name="mern-stack-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -124,7 +127,7 @@ def setup_mern(folder_name="mern-stack-app"):
         
         for cmd in backend_commands:
             print(f"\nExecuting: {cmd}")
-            if not run_command(cmd, cwd=backend_path):
+            if not await run_blocking(run_command, cmd, cwd=backend_path):
                 return False
 
         # Create backend directory structure
@@ -212,7 +215,7 @@ NODE_ENV=development"""
         
         for cmd in frontend_commands:
             print(f"\nExecuting: {cmd}")
-            if not run_command(cmd, cwd=frontend_path):
+            if not await run_blocking(run_command, cmd, cwd=frontend_path):
                 return False
         
         # Use the same helper functions as setup_vite
@@ -299,7 +302,7 @@ async def func(args):
     try:
         folder_name = args.get("folder_name", "mern_project")
         
-        if setup_mern(folder_name):
+        if await setup_mern(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"MERN Stack project created successfully in {folder_name}"
@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -25,7 +28,7 @@ def run_command(command, cwd=None):
         print(f"Error executing command: {str(e)}")
         return False
 
-def setup_nextjs(folder_name="nextjs-app"):
+async def setup_nextjs(folder_name="nextjs-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -56,7 +59,7 @@ def setup_nextjs(folder_name="nextjs-app"):
         # Create Next.js project with TypeScript and Tailwind
         create_command = f"npx create-next-app@latest {folder_name} --ts --tailwind --eslint --app --src-dir --import-alias '@/*' -y --no-turbopack --use-npm --yes"
         
-        if not run_command(create_command, cwd=path):
+        if not await run_blocking(run_command, create_command, cwd=path):
             return False
         
         # Update the page.tsx with custom content
@@ -124,7 +127,7 @@ async def func(args):
         path = args.get("path", os.path.expanduser("~"))
         folder_name = args.get("folder_name", "next_project")
         
-        if setup_nextjs(folder_name):
+        if await setup_nextjs(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"Next.js project created successfully in {folder_name}"
@@ -0,0 +1,285 @@
+import asyncio
+import os
+import re
+import time
+import weakref
+from html.parser import HTMLParser
+from pathlib import Path
+
+import httpx
+
+from tool_cache import DiskCache
+from tool_executor import run_blocking
+from tool_tracing import span, traced
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as FastHTMLParser
+except ImportError:
+    FastHTMLParser = None
+
+PAGE_CACHE_DB = os.environ.get("SCRIPTY_PAGE_CACHE_DB", str(Path.home() / ".scripty" / "page_cache.db"))
+
+# Defaults for fetching pages; change them with configure()
+settings = {
+    "max_bytes": int(os.environ.get("SCRIPTY_PAGE_MAX_BYTES", str(512 * 1024))),
+    "timeout": float(os.environ.get("SCRIPTY_PAGE_TIMEOUT", "5")),
+    "max_chars": int(os.environ.get("SCRIPTY_PAGE_MAX_CHARS", "4000")),
+    "concurrency": int(os.environ.get("SCRIPTY_PAGE_CONCURRENCY", "4")),
+    "max_connections": int(os.environ.get("SCRIPTY_PAGE_MAX_CONNECTIONS", "10")),
+    "cache_enabled": os.environ.get("SCRIPTY_PAGE_CACHE", "1") == "1",
+    "cache_path": PAGE_CACHE_DB,
+    "cache_ttl": float(os.environ.get("SCRIPTY_PAGE_CACHE_TTL", str(7 * 24 * 3600))),
+    "cache_max_bytes": int(os.environ.get("SCRIPTY_PAGE_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+    "transport": None,
+}
+
+USER_AGENT = "Mozilla/5.0 (compatible; ScriptyAssistant/1.0)"
+TEXT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+# Elements whose text is never page content
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "iframe",
+             "nav", "header", "footer", "aside", "form", "button", "select"}
+# Elements that start a new line of text
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "br", "li", "ul", "ol", "table",
+              "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote",
+              "dd", "dt", "figcaption"}
+# Preferred over the whole body when present
+MAIN_TAGS = ("article", "main")
+
+_clients = weakref.WeakKeyDictionary()
+_cache = None
+
+
+class TextExtractor(HTMLParser):
+    """Collects visible text, keeping <article>/<main> text separately"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.parts = []
+        self.main_parts = []
+        self._skip = 0
+        self._main = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in MAIN_TAGS:
+            self._main += 1
+        if tag in BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in MAIN_TAGS:
+            self._main = max(0, self._main - 1)
+        if tag in BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self._append(data)
+
+    def _append(self, text):
+        self.parts.append(text)
+        if self._main:
+            self.main_parts.append(text)
+
+
+def _clean(text):
+    lines = (re.sub(r"[ \t\r\f\v\xa0]+", " ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _extract_fast(markup):
+    tree = FastHTMLParser(markup)
+    title = tree.css_first("title")
+    tree.strip_tags(list(SKIP_TAGS))
+    root = tree.css_first("article") or tree.css_first("main") or tree.body or tree.root
+    text = root.text(separator="\n") if root is not None else ""
+    return (title.text().strip() if title is not None else ""), _clean(text)
+
+
+def html_to_text(markup):
+    """Title and main visible text of an HTML document; returns (title, text)"""
+    if FastHTMLParser is not None:
+        return _extract_fast(markup)
+    parser = TextExtractor()
+    parser.feed(markup)
+    parser.close()
+    parts = parser.main_parts if "".join(parser.main_parts).strip() else parser.parts
+    return parser.title.strip(), _clean("".join(parts))
+
+
+def _charset(response, head):
+    if response.charset_encoding:
+        return response.charset_encoding
+    match = re.search(rb"""<meta[^>]+charset=["']?([\w-]+)""", head[:2048], re.IGNORECASE)
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def get_client():
+    """Pooled client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings["timeout"]),
+            limits=httpx.Limits(max_connections=settings["max_connections"]),
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            transport=settings["transport"],
+        )
+        _clients[loop] = client
+    return client
+
+
+async def aclose():
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def get_cache():
+    """Extracted pages by URL, stored with their ETag/Last-Modified for revalidation"""
+    global _cache
+    if not settings["cache_enabled"]:
+        return None
+    if _cache is None:
+        _cache = DiskCache(settings["cache_path"], settings["cache_max_bytes"])
+    return _cache
+
+
+def configure(**options):
+    """
+    Update fetch settings (max_bytes, timeout, max_chars, concurrency,
+    max_connections, cache_enabled, cache_path, cache_ttl, cache_max_bytes,
+    transport). Open clients and the cache are rebuilt on next use.
+    """
+    global _cache
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown page settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+    for loop, client in list(_clients.items()):
+        _clients.pop(loop, None)
+        if not loop.is_closed():
+            if loop.is_running():
+                loop.call_soon_threadsafe(lambda c=client: asyncio.ensure_future(c.aclose()))
+            else:
+                loop.run_until_complete(client.aclose())
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+async def _download(url, cached, max_bytes):
+    """
+    GET a page, stopping at max_bytes. Returns (status, headers, body, truncated);
+    body is (bytes, encoding, content type), or None for 304s and errors.
+    """
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    async with get_client().stream("GET", url, headers=headers) as response:
+        if response.status_code == 304 or response.status_code >= 400:
+            return response.status_code, response.headers, None, False
+        content_type = response.headers.get("content-type", "text/html").split(";")[0].strip().lower()
+        if content_type not in TEXT_TYPES:
+            raise ValueError(f"Unsupported content type: {content_type}")
+        data = bytearray()
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            data.extend(chunk)
+            if len(data) >= max_bytes:
+                del data[max_bytes:]
+                truncated = True
+                break
+        data = bytes(data)
+        return response.status_code, response.headers, (data, _charset(response, data), content_type), truncated
+
+
+@traced("page.fetch", capture=("url",))
+async def fetch_page(url, max_bytes=None, max_chars=None):
+    """
+    Download one page within the byte budget and extract its text.
+    Revalidates cached pages with If-None-Match and reuses the cached text
+    on 304 or an unchanged ETag.
+    """
+    max_bytes = max_bytes or settings["max_bytes"]
+    max_chars = max_chars or settings["max_chars"]
+    cache = get_cache()
+    cached = cache.get(url) if cache is not None else None
+    if cached and cached["truncated"] and cached["max_bytes"] < max_bytes:
+        # Cut short under a smaller budget last time; fetch it whole
+        cached = None
+    started = time.perf_counter()
+
+    status, headers, body, truncated = await _download(url, cached, max_bytes)
+    etag = headers.get("etag")
+    page = {"url": url, "status": status}
+
+    if status == 304 or (cached and etag and etag == cached.get("etag")):
+        page.update(title=cached["title"], content=cached["content"], truncated=cached["truncated"], cached=True)
+    elif status >= 400:
+        raise ValueError(f"HTTP {status} from {url}")
+    else:
+        data, encoding, content_type = body
+        text = data.decode(encoding, errors="replace")
+        with span("page.extract", bytes=len(data)):
+            if content_type == "text/plain":
+                title, content = "", _clean(text)
+            else:
+                title, content = await run_blocking(html_to_text, text)
+        page.update(title=title, content=content, truncated=truncated, cached=False, bytes=len(data))
+        if cache is not None and (etag or headers.get("last-modified")):
+            cache.set(url, {
+                "etag": etag,
+                "last_modified": headers.get("last-modified"),
+                "title": title,
+                "content": content,
+                "truncated": truncated,
+                "max_bytes": max_bytes,
+            }, settings["cache_ttl"])
+
+    if len(page["content"]) > max_chars:
+        page["content"] = page["content"][:max_chars].rsplit(" ", 1)[0] + " ..."
+        page["truncated"] = True
+    page["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return page
+
+
+async def fetch_pages(urls, max_bytes=None, max_chars=None, timeout=None, concurrency=None):
+    """
+    Fetch several pages concurrently. Each page gets its own time budget;
+    failures come back as {"url", "error"} without affecting the others.
+    Results are in the order of `urls`.
+    """
+    timeout = timeout or settings["timeout"]
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings["concurrency"]))
+
+    async def fetch(url):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(fetch_page(url, max_bytes, max_chars), timeout)
+            except asyncio.TimeoutError:
+                return {"url": url, "error": f"Timed out after {timeout}s"}
+            except Exception as e:
+                return {"url": url, "error": str(e) or type(e).__name__}
+
+    return await asyncio.gather(*[fetch(url) for url in urls])
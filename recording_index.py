@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+RECORDING_INDEX_DB = os.environ.get(
+    "SCRIPTY_RECORDING_INDEX_DB", str(Path.home() / ".scripty" / "recording_index.db"))
+# Directory mtimes this recent aren't trusted: a file added within the same
+# timestamp tick (2 s on FAT) wouldn't change it again
+MTIME_SETTLE_SECONDS = 2.0
+# Sorts after any character a file name can contain; bounds prefix range scans
+PREFIX_END = "\U0010ffff"
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+def _duration(path):
+    if sf is None:
+        return None
+    try:
+        return sf.info(path).duration
+    except Exception:
+        return None
+
+
+class RecordingIndex:
+    """
+    Audio files per directory in SQLite: name, stem, extension, mtime, size
+    and duration. A directory is rescanned only when its own mtime changes,
+    and then only new or changed files are stat'ed and probed. Latest-file
+    and name-prefix lookups are single index seeks.
+    """
+
+    def __init__(self, path, extensions):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.extensions = {ext.lower() for ext in extensions}
+        self.stats = {"scans": 0, "probed": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS directories (dir TEXT PRIMARY KEY, mtime_ns INTEGER)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS recordings ("
+            "dir TEXT NOT NULL, name TEXT NOT NULL, key TEXT NOT NULL, stem TEXT NOT NULL, ext TEXT NOT NULL, "
+            "mtime REAL NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, duration REAL, "
+            "PRIMARY KEY (dir, name))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings (dir, mtime_ns)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS recordings_key ON recordings (dir, key)")
+
+    def refresh(self, directory):
+        """Bring the entries for `directory` up to date; cheap when it hasn't changed"""
+        directory = str(Path(directory).resolve())
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        with self._lock:
+            row = self._db.execute("SELECT mtime_ns FROM directories WHERE dir = ?", (directory,)).fetchone()
+            if row is not None and row[0] is not None and row[0] == mtime_ns:
+                return
+            known = {
+                name: (size, file_mtime_ns)
+                for name, size, file_mtime_ns in self._db.execute(
+                    "SELECT name, size, mtime_ns FROM recordings WHERE dir = ?", (directory,))
+            }
+
+        seen, changed = set(), []
+        if mtime_ns is not None:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() not in self.extensions or not entry.is_file():
+                        continue
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    if known.get(entry.name) != (stat.st_size, stat.st_mtime_ns):
+                        changed.append((
+                            directory, entry.name, entry.name.casefold(), stem, ext.lower(), stat.st_mtime,
+                            stat.st_mtime_ns, stat.st_size, _duration(entry.path),
+                        ))
+        trusted = mtime_ns if mtime_ns is not None and time.time() - mtime_ns / 1e9 > MTIME_SETTLE_SECONDS else None
+
+        with self._lock:
+            self.stats["scans"] += 1
+            self.stats["probed"] += len(changed)
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO recordings "
+                    "(dir, name, key, stem, ext, mtime, mtime_ns, size, duration) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    changed,
+                )
+                self._db.executemany(
+                    "DELETE FROM recordings WHERE dir = ? AND name = ?",
+                    [(directory, name) for name in set(known) - seen],
+                )
+                self._db.execute("INSERT OR REPLACE INTO directories (dir, mtime_ns) VALUES (?, ?)", (directory, trusted))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _row(self, directory, row):
+        if row is None:
+            return None
+        name, stem, ext, mtime, size, duration = row
+        return {
+            "path": os.path.join(directory, name),
+            "name": name,
+            "stem": stem,
+            "ext": ext,
+            "mtime": mtime,
+            "size": size,
+            "duration": duration,
+        }
+
+    def latest(self, directory):
+        """The most recently modified recording in `directory`, or None"""
+        directory = str(Path(directory).resolve())
+        self.refresh(directory)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT name, stem, ext, mtime, size, duration FROM recordings "
+                "WHERE dir = ? ORDER BY mtime_ns DESC LIMIT 1", (directory,)).fetchone()
+        return self._row(directory, row)
+
+    def find_prefix(self, directory, prefix):
+        """
+        A recording whose name starts with `prefix` (ignoring case), or None.
+        With several matches the last by name wins, which for timestamped
+        names like recording_20240312_093000.wav is the newest.
+        """
+        directory = str(Path(directory).resolve())
+        self.refresh(directory)
+        key = prefix.casefold()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT name, stem, ext, mtime, size, duration FROM recordings "
+                "WHERE dir = ? AND key >= ? AND key < ? ORDER BY key DESC LIMIT 1",
+                (directory, key, key + PREFIX_END)).fetchone()
+        return self._row(directory, row)
+
+    def entries(self, directory):
+        """Every recording in `directory`, newest first"""
+        directory = str(Path(directory).resolve())
+        self.refresh(directory)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, stem, ext, mtime, size, duration FROM recordings "
+                "WHERE dir = ? ORDER BY mtime_ns DESC", (directory,)).fetchall()
+        return [self._row(directory, row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def get_index(extensions):
+    """Shared index of files with the given extensions"""
+    extensions = frozenset(ext.lower() for ext in extensions)
+    with _index_lock:
+        index = _indexes.get(extensions)
+        if index is None:
+            index = _indexes[extensions] = RecordingIndex(RECORDING_INDEX_DB, extensions)
+        return index
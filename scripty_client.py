@@ -0,0 +1,108 @@
+import asyncio
+import os
+import weakref
+
+import httpx
+
+from tool_tracing import span
+
+BASE_URL = os.environ.get("SCRIPTY_API_URL", "https://scripty.me/api/assistant")
+
+# Defaults for the shared client; change them with configure()
+settings = {
+    "base_url": BASE_URL,
+    "timeout": float(os.environ.get("SCRIPTY_API_TIMEOUT", "60")),
+    "connect_timeout": float(os.environ.get("SCRIPTY_API_CONNECT_TIMEOUT", "10")),
+    "http2": os.environ.get("SCRIPTY_API_HTTP2", "1") == "1",
+    "max_connections": int(os.environ.get("SCRIPTY_API_MAX_CONNECTIONS", "20")),
+    "max_keepalive_connections": int(os.environ.get("SCRIPTY_API_MAX_KEEPALIVE", "10")),
+    "keepalive_expiry": float(os.environ.get("SCRIPTY_API_KEEPALIVE_EXPIRY", "60")),
+    "transport": None,
+}
+
+# httpx.AsyncClient is tied to the event loop it first ran on, so keep one per loop
+_clients = weakref.WeakKeyDictionary()
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def configure(**options):
+    """
+    Update client settings (base_url, timeout, connect_timeout, http2,
+    max_connections, max_keepalive_connections, keepalive_expiry, transport).
+    Clients already open are closed and rebuilt on next use.
+    """
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+    for loop, client in list(_clients.items()):
+        _clients.pop(loop, None)
+        if not loop.is_closed():
+            if loop.is_running():
+                loop.call_soon_threadsafe(lambda c=client: asyncio.ensure_future(c.aclose()))
+            else:
+                loop.run_until_complete(client.aclose())
+
+
+def _build_client():
+    timeout = httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"])
+    limits = httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+    return httpx.AsyncClient(
+        base_url=settings["base_url"],
+        timeout=timeout,
+        limits=limits,
+        http2=settings["http2"] and http2_available(),
+        transport=settings["transport"],
+    )
+
+
+def get_client():
+    """Return the pooled client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[loop] = client
+    return client
+
+
+async def aclose():
+    """Close the running loop's client and drop its pooled connections"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def request(method, path, authtoken=None, **kwargs):
+    """
+    Send a request to a scripty.me assistant endpoint, e.g.
+    `await request("GET", "/calendar/events", authtoken)`.
+    Returns the httpx.Response; callers decide whether to raise_for_status().
+    """
+    headers = dict(kwargs.pop("headers", None) or {})
+    if authtoken:
+        headers["Authorization"] = f"Bearer {authtoken}"
+    with span("http.request", method=method, path=path) as current:
+        response = await get_client().request(method, path, headers=headers, **kwargs)
+        current.set_attribute("status_code", response.status_code)
+        current.set_attribute("http_version", response.http_version)
+        return response
+
+
+async def get(path, authtoken=None, **kwargs):
+    return await request("GET", path, authtoken, **kwargs)
+
+
+async def post(path, authtoken=None, **kwargs):
+    return await request("POST", path, authtoken, **kwargs)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from tool_cache import DiskCache
+
+SEARCH_CACHE_DB = os.environ.get("SCRIPTY_SEARCH_CACHE_DB", str(Path.home() / ".scripty" / "search_cache.db"))
+
+# Defaults for the shared cache; change them with configure()
+settings = {
+    "enabled": os.environ.get("SCRIPTY_SEARCH_CACHE", "1") == "1",
+    "path": SEARCH_CACHE_DB,
+    "ttl": float(os.environ.get("SCRIPTY_SEARCH_CACHE_TTL", str(6 * 3600))),
+    "max_bytes": int(os.environ.get("SCRIPTY_SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    "remove_stopwords": os.environ.get("SCRIPTY_SEARCH_STOPWORDS", "0") == "1",
+}
+
+# Dropped from cache keys when remove_stopwords is on; Google mostly ignores them too
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where",
+    "which", "who", "why", "with",
+})
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def normalize_query(query, remove_stopwords=False):
+    """Casefold and collapse whitespace so trivially different queries share an entry"""
+    words = query.casefold().split()
+    if remove_stopwords:
+        # A query made only of stopwords keeps them rather than becoming ""
+        words = [word for word in words if word not in STOPWORDS] or words
+    return " ".join(words)
+
+
+class SearchCache:
+    """Search backend responses on disk, keyed by normalized query, with hit/miss counters"""
+
+    def __init__(self, path, ttl, max_bytes, remove_stopwords=False):
+        self.disk = DiskCache(path, max_bytes)
+        self.ttl = ttl
+        self.remove_stopwords = remove_stopwords
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def key(self, query, **params):
+        canonical = json.dumps(
+            [normalize_query(query, self.remove_stopwords), params],
+            sort_keys=True, separators=(",", ":"),
+        )
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, query, **params):
+        value = self.disk.get(self.key(query, **params))
+        with self._lock:
+            self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def contains(self, query, **params):
+        """Whether a fresh entry exists, without counting a hit or miss"""
+        return self.disk.get(self.key(query, **params)) is not None
+
+    def set(self, query, value, **params):
+        self.disk.set(self.key(query, **params), value, self.ttl)
+
+    def clear(self):
+        self.disk.clear()
+
+    def close(self):
+        self.disk.close()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+def get_cache():
+    """Return the shared cache, or None when caching is disabled"""
+    global _cache
+    if not settings["enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache(
+                settings["path"],
+                ttl=settings["ttl"],
+                max_bytes=settings["max_bytes"],
+                remove_stopwords=settings["remove_stopwords"],
+            )
+        return _cache
+
+
+def configure(**options):
+    """
+    Update cache settings (enabled, path, ttl, max_bytes, remove_stopwords).
+    The current cache is closed and reopened on next use.
+    """
+    global _cache
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown search cache settings: {', '.join(sorted(unknown))}")
+    with _cache_lock:
+        settings.update(options)
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,361 @@
+import asyncio
+import collections
+import email.utils
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from tool_executor import run_blocking
+from tool_tracing import current_span, percentile, span
+
+SERPER_URL = os.environ.get("SERPER_URL", "https://google.serper.dev")
+SERPER_API_KEY = os.environ.get("SERPER_API_KEY", "0cde2022efed535909470fc4df4fb8e23985f9a9")
+
+# Defaults for the shared pool; change them with configure().
+# url may be http:// to point the searcher at a local stub.
+settings = {
+    "url": SERPER_URL,
+    "api_key": SERPER_API_KEY,
+    "timeout": float(os.environ.get("SERPER_TIMEOUT", "15")),
+    "connect_timeout": float(os.environ.get("SERPER_CONNECT_TIMEOUT", "5")),
+    "pool_size": int(os.environ.get("SERPER_POOL_SIZE", "8")),
+    "idle_timeout": float(os.environ.get("SERPER_IDLE_TIMEOUT", "60")),
+    # Token bucket sized to the account quota: requests per second and burst
+    "rate_limit": float(os.environ.get("SERPER_RATE_LIMIT", "5")),
+    "burst": int(os.environ.get("SERPER_BURST", "5")),
+    # Retries on 429/5xx with exponential jittered backoff, or Retry-After
+    "max_retries": int(os.environ.get("SERPER_MAX_RETRIES", "3")),
+    "backoff_base": float(os.environ.get("SERPER_BACKOFF_BASE", "0.5")),
+    "backoff_max": float(os.environ.get("SERPER_BACKOFF_MAX", "30")),
+    # Object with the pool's request(method, path, body, headers) used in its
+    # place, e.g. cassette.CassettePool
+    "transport": None,
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Errors that mean a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+_pool = None
+_limiter = None
+_pool_lock = threading.Lock()
+retry_stats = {"retries": 0, "retry_wait_s": 0.0, "gave_up": 0}
+
+
+class SerperError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(f"Serper API returned {status}: {message}")
+        self.status = status
+        self.headers = headers or {}
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive connections to one host. At most pool_size
+    connections are open at once; extra callers wait for one to free up.
+    """
+
+    def __init__(self, url, pool_size=8, timeout=15, connect_timeout=5, idle_timeout=60):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported Serper URL: {url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.stats = {"connections": 0, "reused": 0, "reconnects": 0}
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        conn = connection_class(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        # The connect timeout only covers the handshake; reads get the longer one
+        conn.sock.settimeout(self.timeout)
+        with self._lock:
+            self.stats["connections"] += 1
+        return conn
+
+    def _checkout(self):
+        """Most recently used idle connection, or None if a new one is needed"""
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, idle_since = self._idle.pop()
+                if now - idle_since < self.idle_timeout:
+                    self.stats["reused"] += 1
+                    return conn
+                conn.close()
+        return None
+
+    def _checkin(self, conn):
+        with self._lock:
+            if not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request; a connection the server dropped while idle is retried once on a fresh one"""
+        self._slots.acquire()
+        try:
+            conn = self._checkout()
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = self._connect()
+                try:
+                    conn.request(method, self.base_path + path, body, headers or {})
+                    response = conn.getresponse()
+                    data = response.read()
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    with self._lock:
+                        self.stats["reconnects"] += 1
+                    conn, reused = None, False
+                    continue
+                except BaseException:
+                    conn.close()
+                    raise
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._checkin(conn)
+                return Response(response.status, dict(response.getheaders()), data)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread and event loop. Callers reserve a
+    token and sleep until it is due, so waiters are served in arrival order.
+    On 429s the rate halves, then creeps back to the configured rate.
+    """
+
+    def __init__(self, rate, burst, min_rate=0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.stats = {"acquired": 0, "waited": 0, "queue_depth": 0, "max_queue_depth": 0, "throttled": 0}
+        self._waits = collections.deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token; returns how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            self.stats["acquired"] += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self._waits.append(wait)
+            if wait:
+                self.stats["waited"] += 1
+                self.stats["queue_depth"] += 1
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.stats["queue_depth"])
+            return wait
+
+    def _done_waiting(self):
+        with self._lock:
+            self.stats["queue_depth"] -= 1
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting()
+        return wait
+
+    def throttle(self):
+        """Back off after the API said we are over quota"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.stats["throttled"] += 1
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                **self.stats,
+                "rate": round(self.rate, 3),
+                "wait_p50_ms": round(percentile(waits, 50) * 1000, 1) if waits else 0.0,
+                "wait_p95_ms": round(percentile(waits, 95) * 1000, 1) if waits else 0.0,
+                "wait_max_ms": round(waits[-1] * 1000, 1) if waits else 0.0,
+            }
+
+
+def get_limiter():
+    """Return the shared rate limiter, creating it on first use"""
+    global _limiter
+    with _pool_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(settings["rate_limit"], settings["burst"])
+        return _limiter
+
+
+def get_pool():
+    """Return the shared pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                settings["url"],
+                pool_size=settings["pool_size"],
+                timeout=settings["timeout"],
+                connect_timeout=settings["connect_timeout"],
+                idle_timeout=settings["idle_timeout"],
+            )
+        return _pool
+
+
+def configure(**options):
+    """
+    Update client settings (url, api_key, timeout, connect_timeout,
+    pool_size, idle_timeout, rate_limit, burst, max_retries, backoff_base,
+    backoff_max, transport). The current pool is closed and rebuilt on next use.
+    """
+    global _pool, _limiter
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown Serper settings: {', '.join(sorted(unknown))}")
+    with _pool_lock:
+        settings.update(options)
+        pool, _pool = _pool, None
+        if {"rate_limit", "burst"} & set(options):
+            _limiter = None
+    if pool is not None:
+        pool.close()
+
+
+def close():
+    """Drop the shared pool's connections; the next request reconnects"""
+    configure()
+
+
+def post(path, payload):
+    """Blocking POST of a JSON payload to the Serper API; returns a Response"""
+    pool = settings["transport"] or get_pool()
+    headers = {
+        "X-API-KEY": settings["api_key"],
+        "Content-Type": "application/json",
+    }
+    with span("http.request", method="POST", host=pool.host, path=path) as current:
+        response = pool.request("POST", path, json.dumps(payload), headers)
+        current.set_attribute("status_code", response.status)
+        return response
+
+
+def search(query, **params):
+    """Run one Google search through Serper and return the parsed JSON body"""
+    response = post("/search", {"q": query, **params})
+    if response.status >= 400:
+        try:
+            message = response.json().get("message", "")
+        except ValueError:
+            message = response.body[:200].decode("utf-8", "replace")
+        raise SerperError(response.status, message, response.headers)
+    return response.json()
+
+
+def retry_delay(error, attempt):
+    """Seconds to wait before retrying: Retry-After when given, else jittered exponential backoff"""
+    retry_after = error.headers.get("Retry-After") or error.headers.get("retry-after")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(0.0, delay), settings["backoff_max"])
+    return random.uniform(0, min(settings["backoff_max"], settings["backoff_base"] * 2 ** attempt))
+
+
+async def search_async(query, **params):
+    """
+    search() behind the rate limiter, run off the event loop, retrying
+    429 and 5xx responses up to max_retries times.
+    """
+    limiter = get_limiter()
+    attempt = 0
+    while True:
+        waited = await limiter.acquire()
+        parent = current_span()
+        if parent is not None and waited:
+            parent.set_attribute("rate_limit_wait_ms", round(waited * 1000, 1))
+        try:
+            result = await run_blocking(search, query, **params)
+        except SerperError as e:
+            if e.status not in RETRY_STATUSES:
+                raise
+            if e.status == 429:
+                limiter.throttle()
+            if attempt >= settings["max_retries"]:
+                retry_stats["gave_up"] += 1
+                raise
+            delay = retry_delay(e, attempt)
+            attempt += 1
+            retry_stats["retries"] += 1
+            retry_stats["retry_wait_s"] += delay
+            await asyncio.sleep(delay)
+            continue
+        limiter.recover()
+        return result
+
+
+def stats():
+    """Rate limiter, retry and connection counters for sizing the quota"""
+    return {
+        "rate_limit": get_limiter().snapshot(),
+        **{key: round(value, 3) for key, value in retry_stats.items()},
+        "pool": dict(get_pool().stats),
+    }
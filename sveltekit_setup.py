@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -25,7 +28,7 @@ def run_command(command, cwd=None):
         print(f"Error executing command: {str(e)}")
         return False
 
-def setup_sveltekit(folder_name="sveltekit-app"):
+async def setup_sveltekit(folder_name="sveltekit-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -62,7 +65,7 @@ def setup_sveltekit(folder_name="sveltekit-app"):
         
         for cmd in commands:
             print(f"\nExecuting: {cmd}")
-            if not run_command(cmd, cwd=path if cmd == commands[0] else full_path):
+            if not await run_blocking(run_command, cmd, cwd=path if cmd == commands[0] else full_path):
                 return False
 
         # Create Tailwind config
@@ -224,7 +227,7 @@ async def func(args):
                 "error": "Folder name is required"
             })
             
-        if setup_sveltekit(folder_name):
+        if await setup_sveltekit(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"SvelteKit project created successfully in {folder_name}"
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+from tool_cache import is_error_result
+from tool_encoding import encode_result
+from tool_tracing import span
+
+DEFAULT_CONCURRENCY = int(os.environ.get("SCRIPTY_BATCH_CONCURRENCY", "4"))
+
+
+async def batch_call(registry, tool, arg_list, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Run one tool over many argument dicts and yield each item as soon as it
+    finishes: {"index", "args", "success", "result"} or {..., "error"}.
+    One item failing never affects the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index, args):
+        async with semaphore:
+            try:
+                result = await registry.call(tool, args)
+            except Exception as e:
+                return {"index": index, "args": args, "success": False, "error": f"{type(e).__name__}: {e}"}
+            return {"index": index, "args": args, "success": not is_error_result(result), "result": result}
+
+    with span("batch", tool=tool, items=len(arg_list), concurrency=concurrency) as current:
+        tasks = [asyncio.ensure_future(run(index, args)) for index, args in enumerate(arg_list)]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                failed += not item["success"]
+                yield item
+        finally:
+            # The caller may stop iterating early; don't leave work running
+            for task in tasks:
+                task.cancel()
+            current.set_attribute("failed", failed)
+
+
+async def batch_call_all(registry, tool, arg_list, concurrency=DEFAULT_CONCURRENCY):
+    """Collect every item of batch_call, in input order"""
+    items = [item async for item in batch_call(registry, tool, arg_list, concurrency)]
+    return sorted(items, key=lambda item: item["index"])
+
+
+async def batch_call_json(registry, tool, arg_list, concurrency=DEFAULT_CONCURRENCY):
+    """Stream batch results as JSON lines for hosts that forward them as they arrive"""
+    async for item in batch_call(registry, tool, arg_list, concurrency):
+        yield encode_result(item) + "\n"
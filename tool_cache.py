@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from tool_encoding import decode_result, encode_result_bytes
+
+MAX_MEMORY_BYTES = int(os.environ.get("SCRIPTY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+MAX_DISK_BYTES = int(os.environ.get("SCRIPTY_CACHE_MAX_DISK_BYTES", str(256 * 1024 * 1024)))
+CACHE_DB = os.environ.get("SCRIPTY_CACHE_DB")
+
+# Which tool calls are safe to cache and for how long.
+#   ttl:            seconds a result stays fresh
+#   actions:        only cache calls whose "action" arg is one of these
+#   cache_if:       extra predicate on the args
+#   persist:        also keep results in the on-disk tier
+#   invalidated_by: (tool, action) calls that drop every cached result of this tool
+# web_search is absent on purpose: it keeps its own cache (search_cache.py)
+# keyed on the normalized query. So is audio_transcriber: a result alone
+# wouldn't write the transcript file, and transcript_manifest.py already
+# keeps recordings from being uploaded twice.
+CACHE_POLICIES = {
+    "calendar_manager": {
+        "ttl": 60,
+        "actions": {"get_events", "get_free_slots"},
+        "invalidated_by": {("calendar_manager", "create_event")},
+    },
+}
+
+
+def is_error_result(result):
+    """Scripts report failures in the result instead of raising"""
+    if isinstance(result, dict):
+        return "error" in result or result.get("success") is False
+    if isinstance(result, str):
+        return '"error":' in result or '"success": false' in result or '"success":false' in result
+    return False
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value.strip())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def cache_key(tool, args):
+    """Stable key for a call; whitespace and key order in the args don't matter"""
+    canonical = json.dumps([tool, _normalize(args or {})], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def _size_of(value):
+    if isinstance(value, str):
+        return len(value)
+    return len(encode_result_bytes(value))
+
+
+class MemoryCache:
+    """LRU with per-entry expiry, bounded by total size in bytes"""
+
+    def __init__(self, max_bytes=MAX_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, size, tag, value = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tag=None, size=None):
+        size = _size_of(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, size, tag, value)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.bytes -= entry[1]
+
+    def delete_tag(self, tag):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[2] == tag]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """SQLite key/value store with expiry and least-recently-used eviction by size"""
+
+    def __init__(self, path, max_bytes=MAX_DISK_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, tag TEXT, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_tag ON entries (tag)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return decode_result(row[0])[0]
+
+    def set(self, key, value, ttl, tag=None):
+        encoded = encode_result_bytes([value]).decode("utf-8")
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, tag, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, tag, encoded, now + ttl, now, size),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def delete_tag(self, tag):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE tag = ?", (tag,))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ResponseCache:
+    """
+    Caches idempotent tool results according to CACHE_POLICIES.
+    Lookups check memory first, then the optional SQLite tier.
+    """
+
+    def __init__(self, policies=None, max_bytes=MAX_MEMORY_BYTES, db_path=CACHE_DB):
+        self.policies = CACHE_POLICIES if policies is None else policies
+        self.memory = MemoryCache(max_bytes)
+        self.disk = DiskCache(db_path) if db_path else None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _cacheable(self, tool, args):
+        policy = self.policies.get(tool)
+        if not policy:
+            return None
+        if "actions" in policy and args.get("action") not in policy["actions"]:
+            return None
+        if "cache_if" in policy and not policy["cache_if"](args):
+            return None
+        return policy
+
+    def get(self, tool, args):
+        policy = self._cacheable(tool, args)
+        if policy is None:
+            return None
+        key = cache_key(tool, args)
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+        if self.disk is not None and policy.get("persist"):
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                self.memory.set(key, value, policy["ttl"], tag=tool)
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, tool, args, value):
+        policy = self._cacheable(tool, args)
+        if policy is None or value is None or is_error_result(value):
+            return
+        key = cache_key(tool, args)
+        self.memory.set(key, value, policy["ttl"], tag=tool)
+        if self.disk is not None and policy.get("persist"):
+            self.disk.set(key, value, policy["ttl"], tag=tool)
+
+    def invalidate(self, tool):
+        """Drop every cached result for a tool"""
+        self.stats["invalidations"] += 1
+        self.memory.delete_tag(tool)
+        if self.disk is not None:
+            self.disk.delete_tag(tool)
+
+    def after_call(self, tool, args):
+        """Invalidate tools whose policy names this call as a mutation"""
+        action = args.get("action")
+        for cached_tool, policy in self.policies.items():
+            invalidated_by = policy.get("invalidated_by", ())
+            if (tool, action) in invalidated_by or (tool, None) in invalidated_by:
+                self.invalidate(cached_tool)
+
+    async def call(self, tool, args, invoke):
+        """Serve from cache, or await invoke() and store its result"""
+        cached = self.get(tool, args)
+        if cached is not None:
+            return cached, True
+        result = await invoke()
+        self.after_call(tool, args)
+        self.set(tool, args, result)
+        return result, False
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
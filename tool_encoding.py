@@ -0,0 +1,42 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_result_bytes(result):
+    """
+    Encode a tool result for the wire. Scripts may return native dicts/lists
+    (encoded here, with orjson when installed) or an already-encoded JSON string.
+    """
+    if isinstance(result, bytes):
+        return result
+    if isinstance(result, str):
+        return result.encode("utf-8")
+    if orjson is not None:
+        try:
+            return orjson.dumps(result, default=str, option=ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder copes
+            pass
+    return json.dumps(result, default=str).encode("utf-8")
+
+
+def encode_result(result):
+    if isinstance(result, str):
+        return result
+    return encode_result_bytes(result).decode("utf-8")
+
+
+def decode_result(result):
+    """Native form of a result, whether the script returned a dict or a JSON string"""
+    if isinstance(result, (str, bytes)):
+        if orjson is not None:
+            return orjson.loads(result)
+        return json.loads(result)
+    return result
@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = int(os.environ.get("SCRIPTY_MAX_WORKERS", "8"))
+DEFAULT_TOOL_LIMIT = int(os.environ.get("SCRIPTY_TOOL_LIMIT", "4"))
+
+# Max concurrent calls per tool; anything not listed gets DEFAULT_TOOL_LIMIT
+TOOL_LIMITS = {
+    "job_search": 1,
+    "image_convert": 2,
+    "audio_transcriber": 2,
+    "audio_recorder": 1,
+    "github_upload": 1,
+    "express_setup": 1,
+    "fastapi_setup": 1,
+    "flask_setup": 1,
+    "mern_setup": 1,
+    "next_setup": 1,
+    "sveltekit_setup": 1,
+    "vite_setup": 1,
+    "vue_setup": 1,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+# asyncio semaphores belong to one event loop, so keep a set per loop
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_executor():
+    """Shared bounded thread pool for blocking tool work"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="scripty-tool")
+        return _executor
+
+
+def shutdown(wait=True):
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+def tool_limit(tool):
+    return TOOL_LIMITS.get(tool, DEFAULT_TOOL_LIMIT)
+
+
+def set_tool_limit(tool, limit):
+    """Change a tool's concurrency limit; applies to semaphores created afterwards"""
+    TOOL_LIMITS[tool] = max(1, int(limit))
+    for semaphores in _semaphores.values():
+        semaphores.pop(tool, None)
+
+
+def _semaphore(tool):
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.setdefault(loop, {})
+    if tool not in semaphores:
+        semaphores[tool] = asyncio.Semaphore(tool_limit(tool))
+    return semaphores[tool]
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """
+    Run a blocking function on the shared pool so the event loop keeps serving
+    other tool calls. Context variables are carried over to the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+async def run_tool(tool, handler, args):
+    """Invoke a tool entry point under its per-tool concurrency limit"""
+    async with _semaphore(tool):
+        if inspect.iscoroutinefunction(handler):
+            return await handler(args)
+        # Plain functions are blocking by definition
+        result = await run_blocking(handler, args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls: while a call for a key is running, later
+    callers with the same key await its result instead of starting another.
+    """
+
+    def __init__(self):
+        # Futures belong to one event loop, so keep the in-flight calls per loop
+        self._calls = weakref.WeakKeyDictionary()
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs), or the identical call already in flight. Returns (result, shared)."""
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        self.stats["calls"] += 1
+        task = calls.get(key)
+        shared = task is not None
+        if shared:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            calls[key] = task
+            task.add_done_callback(functools.partial(self._finished, calls, key))
+        # Shielded so one caller giving up doesn't cancel the call for the rest
+        return await asyncio.shield(task), shared
+
+    @staticmethod
+    def _finished(calls, key, task):
+        if calls.get(key) is task:
+            del calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller was cancelled
+            task.exception()
+
+    def in_flight(self):
+        return sum(len(calls) for calls in self._calls.values())
@@ -0,0 +1,359 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import sys
+import threading
+from pathlib import Path
+
+from tool_batch import DEFAULT_CONCURRENCY, batch_call
+from tool_cache import ResponseCache, is_error_result
+from tool_encoding import encode_result
+from tool_executor import run_tool
+from tool_tracing import span
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CACHE_PATH = Path.home() / ".scripty" / "registry_cache.json"
+ENTRY_POINTS = ("func", "function")
+CACHE_VERSION = 1
+
+# Calls the static reader is allowed to evaluate while reading `object`.
+SAFE_CALLS = {
+    "platform.system": platform.system,
+    "list": list,
+    "tuple": tuple,
+    "dict": dict,
+    "set": set,
+    "sorted": sorted,
+    "str": str,
+}
+SAFE_METHODS = {"keys", "values", "items", "lower", "upper", "capitalize", "title", "strip", "format", "join"}
+
+
+class NotStatic(Exception):
+    """Raised when a module-level value can't be read without importing the script"""
+
+
+class _StaticEvaluator:
+    """Evaluates the small subset of Python used by `object` definitions"""
+
+    def __init__(self):
+        self.namespace = {}
+
+    def evaluate(self, node):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Dict):
+            if any(key is None for key in node.keys):
+                raise NotStatic("dict unpacking")
+            return {self.evaluate(k): self.evaluate(v) for k, v in zip(node.keys, node.values)}
+        if isinstance(node, ast.List):
+            return [self.evaluate(item) for item in node.elts]
+        if isinstance(node, ast.Tuple):
+            return tuple(self.evaluate(item) for item in node.elts)
+        if isinstance(node, ast.Set):
+            return {self.evaluate(item) for item in node.elts}
+        if isinstance(node, ast.Name):
+            if node.id in self.namespace:
+                return self.namespace[node.id]
+            if node.id in ("True", "False", "None"):
+                return {"True": True, "False": False, "None": None}[node.id]
+            raise NotStatic(f"unknown name {node.id}")
+        if isinstance(node, ast.JoinedStr):
+            return "".join(str(self.evaluate(part)) for part in node.values)
+        if isinstance(node, ast.FormattedValue):
+            value = self.evaluate(node.value)
+            if node.conversion == ord("r"):
+                value = repr(value)
+            elif node.conversion == ord("s"):
+                value = str(value)
+            elif node.conversion == ord("a"):
+                value = ascii(value)
+            spec = self.evaluate(node.format_spec) if node.format_spec else ""
+            return format(value, spec)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return self.evaluate(node.left) + self.evaluate(node.right)
+        if isinstance(node, ast.Call):
+            return self._call(node)
+        raise NotStatic(type(node).__name__)
+
+    def _call(self, node):
+        if node.keywords:
+            raise NotStatic("keyword arguments")
+        args = [self.evaluate(arg) for arg in node.args]
+        dotted = _dotted_name(node.func)
+        if dotted in SAFE_CALLS:
+            return SAFE_CALLS[dotted](*args)
+        if isinstance(node.func, ast.Attribute) and node.func.attr in SAFE_METHODS:
+            target = self.evaluate(node.func.value)
+            return getattr(target, node.func.attr)(*args)
+        raise NotStatic(f"call to {dotted or 'expression'}")
+
+
+def _dotted_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted_name(node.value)
+        return f"{base}.{node.attr}" if base else None
+    return None
+
+
+def read_tool_source(source, filename="<script>"):
+    """
+    Statically pull `object`, `public_description` and the entry point name
+    out of a script's source without executing it.
+    Returns None when the file doesn't look like a tool.
+    """
+    tree = ast.parse(source, filename=filename)
+    evaluator = _StaticEvaluator()
+    entry_point = None
+    is_async = False
+    found_object = False
+    static = True
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in ENTRY_POINTS:
+            # `func` wins over `function` if a script somehow defines both
+            if entry_point != "func":
+                entry_point = node.name
+                is_async = isinstance(node, ast.AsyncFunctionDef)
+            continue
+
+        if isinstance(node, ast.Assign):
+            targets = [t.id for t in node.targets if isinstance(t, ast.Name)]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None and isinstance(node.target, ast.Name):
+            targets = [node.target.id]
+        else:
+            continue
+        if not targets:
+            continue
+
+        try:
+            value = evaluator.evaluate(node.value)
+        except Exception:
+            # NotStatic, or anything that blows up while evaluating: either way
+            # the value is just not readable statically
+            for target in targets:
+                evaluator.namespace.pop(target, None)
+            if "object" in targets:
+                found_object = True
+                static = False
+            continue
+
+        for target in targets:
+            evaluator.namespace[target] = value
+        if "object" in targets:
+            found_object = True
+            static = True
+
+    if not found_object or entry_point is None:
+        return None
+
+    schema = evaluator.namespace.get("object") if static else None
+    if static and not isinstance(schema, dict):
+        static = False
+        schema = None
+
+    return {
+        "entry_point": entry_point,
+        "is_async": is_async,
+        "object": schema,
+        "public_description": evaluator.namespace.get("public_description"),
+        "static": static,
+    }
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ToolRegistry:
+    """
+    Discovers tools in a scripts folder without importing them.
+    Modules are imported the first time their tool is actually called.
+    Idempotent calls are served from `response_cache` (pass False to disable),
+    and tools handled by `workers` (a tool_workers.WorkerManager) run in warm
+    worker processes instead of being imported into the host.
+    """
+
+    def __init__(self, scripts_dir=SCRIPTS_DIR, cache_path=CACHE_PATH, globals=None, response_cache=None, workers=None):
+        self.scripts_dir = Path(scripts_dir).resolve()
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.globals = dict(globals or {})
+        self.response_cache = ResponseCache() if response_cache is None else response_cache
+        self.workers = workers
+        self.tools = {}
+        self.modules = {}
+        self._cache = self._load_cache()
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _load_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return data.get("files", {})
+        except Exception:
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "files": self._cache}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"Failed to save registry cache: {str(e)}")
+
+    def _read(self, path):
+        """Read tool info for a path, reusing the cache when mtime/size or content hash match"""
+        key = str(path)
+        stat = path.stat()
+        cached = self._cache.get(key)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return cached["info"], False
+
+        sha1 = _file_hash(path)
+        if cached and cached["sha1"] == sha1:
+            cached["mtime_ns"] = stat.st_mtime_ns
+            cached["size"] = stat.st_size
+            return cached["info"], True
+
+        with open(path, "r", encoding="utf-8") as f:
+            info = read_tool_source(f.read(), filename=str(path))
+        self._cache[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha1": sha1,
+            "info": info,
+        }
+        return info, True
+
+    def refresh(self):
+        """Rescan the scripts folder; only changed files are re-parsed"""
+        tools = {}
+        changed = False
+        seen = set()
+        for path in sorted(self.scripts_dir.glob("*.py")):
+            seen.add(str(path))
+            try:
+                info, updated = self._read(path)
+            except (SyntaxError, UnicodeDecodeError, OSError) as e:
+                print(f"Skipping {path.name}: {str(e)}")
+                continue
+            changed = changed or updated
+            if info is None:
+                continue
+
+            tool = dict(info, path=str(path), module=path.stem)
+            if not tool["static"]:
+                # Schema depends on runtime values; fall back to importing the script
+                module = self.load_module(path.stem, path)
+                tool["object"] = getattr(module, "object")
+                tool["public_description"] = getattr(module, "public_description", None)
+            name = tool["object"].get("name", path.stem)
+            tool["name"] = name
+            tools[name] = tool
+
+        for key in list(self._cache):
+            if key not in seen:
+                del self._cache[key]
+                changed = True
+        if changed:
+            self._save_cache()
+        self.tools = tools
+        return tools
+
+    def schemas(self):
+        """Return every tool's `object` schema"""
+        return [tool["object"] for tool in self.tools.values()]
+
+    def get(self, name):
+        if name in self.tools:
+            return self.tools[name]
+        for tool in self.tools.values():
+            if tool["module"] == name:
+                return tool
+        raise KeyError(f"Unknown tool: {name}")
+
+    def load_module(self, stem, path=None):
+        """Import a script by file path under a private module name"""
+        with self._lock:
+            if stem in self.modules:
+                return self.modules[stem]
+            path = Path(path) if path else self.scripts_dir / f"{stem}.py"
+            # Scripts may import shared helpers that live next to them
+            if str(self.scripts_dir) not in sys.path:
+                sys.path.insert(0, str(self.scripts_dir))
+            module_name = f"scripty_tool_{stem}"
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            module.__dict__.update(self.globals)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                sys.modules.pop(module_name, None)
+                raise
+            self.modules[stem] = module
+            return module
+
+    def entry_point(self, name):
+        """Return the callable for a tool, importing its module on first use"""
+        tool = self.get(name)
+        module = self.load_module(tool["module"], tool["path"])
+        return getattr(module, tool["entry_point"])
+
+    def is_loaded(self, name):
+        return self.get(name)["module"] in self.modules
+
+    async def call(self, name, args):
+        """Invoke a tool's `func`/`function` with an args dict"""
+        tool = self.get(name)
+        with span(f"tool.{tool['name']}", tool=tool["name"], module=tool["module"]) as current:
+            if self.response_cache:
+                result, cached = await self.response_cache.call(
+                    tool["name"], args, lambda: self._invoke(tool, args, current))
+                current.set_attribute("cached", cached)
+            else:
+                result = await self._invoke(tool, args, current)
+            current.set_attribute("result_error", is_error_result(result))
+            return result
+
+    def batch(self, name, arg_list, concurrency=None):
+        """Stream results of one tool run over many arg dicts; see tool_batch.batch_call"""
+        return batch_call(self, name, arg_list, concurrency or DEFAULT_CONCURRENCY)
+
+    async def call_json(self, name, args):
+        """Invoke a tool and return its result as a JSON string, whatever the script returned"""
+        result = await self.call(name, args)
+        with span("encode", tool=name):
+            return encode_result(result)
+
+    async def _invoke(self, tool, args, current):
+        if self.workers is not None and self.workers.handles(tool["name"]):
+            current.set_attribute("worker", True)
+            handler = self.workers.handler(tool["name"])
+        else:
+            current.set_attribute("cold_import", not self.is_loaded(tool["name"]))
+            handler = self.entry_point(tool["name"])
+        return await run_tool(tool["name"], handler, args)
+
+
+if __name__ == "__main__":
+    registry = ToolRegistry()
+    print(json.dumps(registry.schemas(), indent=2))
@@ -0,0 +1,254 @@
+import contextvars
+import functools
+import inspect
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_FILE = os.environ.get("SCRIPTY_TRACE_FILE", str(Path.home() / ".scripty" / "traces.jsonl"))
+OTLP_ENDPOINT = os.environ.get("SCRIPTY_OTLP_ENDPOINT")
+
+settings = {
+    "enabled": os.environ.get("SCRIPTY_TRACING", "0") == "1",
+    "trace_file": TRACE_FILE,
+    "otlp_endpoint": OTLP_ENDPOINT,
+}
+
+_current_span = contextvars.ContextVar("scripty_current_span", default=None)
+_file_lock = threading.Lock()
+_file = None
+_otel_tracer = None
+
+
+class Span:
+    """One timed phase of a tool call"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "_start", "duration_ms", "status", "error")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+        self.status = "ok"
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "thread": threading.current_thread().name,
+            "pid": os.getpid(),
+        }
+
+
+class _RemoteParent:
+    """Parent span that lives in another process"""
+
+    def __init__(self, trace_id, span_id):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def configure(enabled=None, trace_file=None, otlp_endpoint=None):
+    """Change where spans go; pass trace_file="" to stop writing JSON lines"""
+    global _file, _otel_tracer
+    with _file_lock:
+        if enabled is not None:
+            settings["enabled"] = enabled
+        if trace_file is not None:
+            settings["trace_file"] = trace_file
+            if _file is not None:
+                _file.close()
+                _file = None
+        if otlp_endpoint is not None:
+            settings["otlp_endpoint"] = otlp_endpoint
+            _otel_tracer = None
+
+
+def current_span():
+    return _current_span.get()
+
+
+@contextmanager
+def continue_trace(trace_id, parent_id):
+    """Make spans opened in this block children of a span from another process"""
+    if not trace_id:
+        yield
+        return
+    token = _current_span.set(_RemoteParent(trace_id, parent_id))
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def _write_line(record):
+    global _file
+    line = json.dumps(record, default=str) + "\n"
+    with _file_lock:
+        if not settings["trace_file"]:
+            return
+        if _file is None:
+            path = Path(settings["trace_file"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _file = open(path, "a", encoding="utf-8")
+        _file.write(line)
+        _file.flush()
+
+
+def _get_otel_tracer():
+    """OTLP export is optional and needs opentelemetry-sdk + the OTLP HTTP exporter"""
+    global _otel_tracer
+    if _otel_tracer is not None or not settings["otlp_endpoint"]:
+        return _otel_tracer or None
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        print("OTLP export requires opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http")
+        settings["otlp_endpoint"] = None
+        return None
+    provider = TracerProvider(resource=Resource.create({"service.name": "scripty-tools"}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings["otlp_endpoint"])))
+    _otel_tracer = provider.get_tracer("scripty.tools")
+    return _otel_tracer
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time a block and record it under the current span, e.g.
+    `with span("pil.encode", path=input_path): img.save(...)`.
+    """
+    if not settings["enabled"]:
+        yield NOOP_SPAN
+        return
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    tracer = _get_otel_tracer()
+    otel_scope = tracer.start_as_current_span(name, attributes=attributes) if tracer else None
+    otel_span = otel_scope.__enter__() if otel_scope else None
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+        if otel_scope:
+            for key, value in current.attributes.items():
+                if isinstance(value, (str, bool, int, float)):
+                    otel_span.set_attribute(key, value)
+            otel_scope.__exit__(None, None, None)
+        try:
+            _write_line(current.to_dict())
+        except Exception as e:
+            print(f"Failed to write trace span: {str(e)}")
+
+
+def traced(name=None, capture=(), **attributes):
+    """
+    Decorator version of span() for sync and async functions.
+    Arguments named in `capture` are recorded as span attributes.
+    """
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+        signature = inspect.signature(fn) if capture else None
+
+        def span_attributes(args, kwargs):
+            if not signature:
+                return attributes
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            captured = {key: bound[key] for key in capture if key in bound}
+            return dict(attributes, **captured)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **span_attributes(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **span_attributes(args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(trace_file=None):
+    """Per-span-name count, error count and p50/p95/p99/max durations from a JSON-lines trace file"""
+    durations = {}
+    errors = {}
+    with open(trace_file or settings["trace_file"], "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            durations.setdefault(record["name"], []).append(record["duration_ms"])
+            if record.get("status") == "error":
+                errors[record["name"]] = errors.get(record["name"], 0) + 1
+
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1],
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    print(json.dumps(summarize(sys.argv[1] if len(sys.argv) > 1 else None), indent=2))
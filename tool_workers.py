@@ -0,0 +1,368 @@
+import asyncio
+import functools
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from tool_executor import run_blocking
+from tool_tracing import continue_trace, current_span
+
+MAX_REQUESTS = int(os.environ.get("SCRIPTY_WORKER_MAX_REQUESTS", "200"))
+MAX_MEMORY_MB = int(os.environ.get("SCRIPTY_WORKER_MAX_MEMORY_MB", "1024"))
+START_TIMEOUT = float(os.environ.get("SCRIPTY_WORKER_START_TIMEOUT", "120"))
+PING_TIMEOUT = 5
+# How long a call waits for a free worker before failing
+CHECKOUT_TIMEOUT = float(os.environ.get("SCRIPTY_WORKER_CHECKOUT_TIMEOUT", "600"))
+# Attempts to start a replacement worker, with doubling pauses between them
+RESPAWN_ATTEMPTS = 3
+RESPAWN_BACKOFF = 1.0
+
+# Tools served from warm worker processes, and the heavy modules each worker
+# imports up front. GUI tools (timer, stopwatch, password_manager) stay in the
+# host: their "close" command has to reach the process that owns the window.
+# audio_recorder stays too: it only touches a flag file and starts a detached
+# process, so a warm worker would just hold its imports in memory.
+WORKER_TOOLS = {
+    "job_search": {"preload": ["pandas", "jobspy"], "workers": 1},
+    "image_convert": {"preload": ["PIL.Image"], "workers": 2},
+}
+
+
+def _rss_bytes():
+    """Current resident memory of this process"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current, but better than nothing (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def _worker_main(conn, scripts_dir, tool_name, preload, globals):
+    """Entry point of a worker process: warm up, then serve calls until told to stop"""
+    sys.path.insert(0, scripts_dir)
+    from tool_registry import ToolRegistry
+
+    try:
+        for module in preload:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                print(f"Worker could not preload {module}: {str(e)}")
+        registry = ToolRegistry(scripts_dir, cache_path=None, globals=globals, response_cache=False)
+        handler = registry.entry_point(tool_name)
+    except BaseException as e:
+        conn.send(("error", f"Worker failed to start: {type(e).__name__}: {e}", 0))
+        return
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    conn.send(("ready", os.getpid(), _rss_bytes()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("pong", None, _rss_bytes()))
+            continue
+        if kind == "call":
+            _, args, trace = message
+            try:
+                with continue_trace(*trace):
+                    result = handler(args)
+                    if asyncio.iscoroutine(result):
+                        result = loop.run_until_complete(result)
+                conn.send(("ok", result, _rss_bytes()))
+            except BaseException as e:
+                conn.send(("error", f"{type(e).__name__}: {e}", _rss_bytes()))
+    loop.close()
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+class Worker:
+    """One warm process serving a single tool over a pipe"""
+
+    def __init__(self, context, scripts_dir, tool_name, preload, globals):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, scripts_dir, tool_name, preload, globals),
+            name=f"scripty-worker-{tool_name}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.requests = 0
+        self.rss = 0
+        self.started = time.time()
+
+    def wait_ready(self, timeout=START_TIMEOUT):
+        if not self.conn.poll(timeout):
+            raise WorkerCrashed("Worker did not start in time")
+        kind, value, rss = self.conn.recv()
+        if kind != "ready":
+            raise WorkerCrashed(value)
+        self.rss = rss
+
+    def request(self, message, timeout=None):
+        """Blocking round trip; raises WorkerCrashed if the process dies or times out"""
+        try:
+            self.conn.send(message)
+            if not self.conn.poll(timeout):
+                raise WorkerCrashed(f"No reply within {timeout}s")
+            kind, value, rss = self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError) as e:
+            raise WorkerCrashed(f"Worker exited: {type(e).__name__}: {e}")
+        self.rss = rss
+        return kind, value
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self, timeout=5):
+        try:
+            self.conn.send(("stop",))
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of warm workers for one tool, with max-requests recycling,
+    a resident-memory cap and ping-based health checks.
+    """
+
+    def __init__(self, tool_name, scripts_dir, workers=1, preload=(), globals=None,
+                 max_requests=MAX_REQUESTS, max_memory_mb=MAX_MEMORY_MB, call_timeout=None):
+        self.tool_name = tool_name
+        self.scripts_dir = str(scripts_dir)
+        self.size = workers
+        self.preload = list(preload)
+        self.globals = dict(globals or {})
+        self.max_requests = max_requests
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.call_timeout = call_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.stats = {"calls": 0, "recycled": 0, "crashed": 0}
+        self._idle = []
+        self._idle_lock = threading.Condition()
+        self._workers = set()
+        # Replacements being started; callers wait for them rather than fail
+        self._starting = 0
+
+    def _spawn(self):
+        worker = Worker(self.context, self.scripts_dir, self.tool_name, self.preload, self.globals)
+        try:
+            worker.wait_ready()
+        except BaseException:
+            worker.stop(timeout=1)
+            raise
+        return worker
+
+    def _add_worker(self):
+        """Start one more worker, retrying with backoff; returns whether it joined the pool"""
+        with self._idle_lock:
+            self._starting += 1
+        try:
+            for attempt in range(RESPAWN_ATTEMPTS):
+                try:
+                    worker = self._spawn()
+                except Exception as e:
+                    print(f"Failed to start {self.tool_name} worker (attempt {attempt + 1}): {str(e)}")
+                    if attempt + 1 < RESPAWN_ATTEMPTS:
+                        time.sleep(RESPAWN_BACKOFF * 2 ** attempt)
+                    continue
+                with self._idle_lock:
+                    self._workers.add(worker)
+                    self._idle.append(worker)
+                return True
+            return False
+        finally:
+            with self._idle_lock:
+                self._starting -= 1
+                # Wake callers so they notice a new worker, or an empty pool
+                self._idle_lock.notify_all()
+
+    def start(self):
+        """Start every worker and wait until they have finished importing"""
+        workers = [Worker(self.context, self.scripts_dir, self.tool_name, self.preload, self.globals)
+                   for _ in range(self.size - len(self._workers))]
+        for worker in workers:
+            worker.wait_ready()
+        with self._idle_lock:
+            self._workers.update(workers)
+            self._idle.extend(workers)
+            self._idle_lock.notify_all()
+
+    def _checkout(self, timeout=CHECKOUT_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        with self._idle_lock:
+            while not self._idle:
+                if not self._workers and not self._starting:
+                    raise WorkerCrashed("No workers running")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise WorkerCrashed(f"No worker free within {timeout:g}s")
+                self._idle_lock.wait(remaining)
+            return self._idle.pop()
+
+    def _checkin(self, worker):
+        with self._idle_lock:
+            self._idle.append(worker)
+            self._idle_lock.notify()
+
+    def _replace(self, worker, reason):
+        """Swap a worker for a fresh one"""
+        self.stats[reason] += 1
+        with self._idle_lock:
+            self._workers.discard(worker)
+        worker.stop(timeout=2)
+        # If this fails too, the next health check tries again
+        self._add_worker()
+
+    def _needs_recycling(self, worker):
+        return worker.requests >= self.max_requests or (self.max_memory and worker.rss > self.max_memory)
+
+    def _call_blocking(self, args, trace):
+        try:
+            worker = self._checkout()
+        except WorkerCrashed as e:
+            return {"success": False, "error": f"{self.tool_name} worker failed: {str(e)}"}
+        try:
+            kind, value = worker.request(("call", args, trace), timeout=self.call_timeout)
+        except WorkerCrashed as e:
+            self._replace(worker, "crashed")
+            return {"success": False, "error": f"{self.tool_name} worker failed: {str(e)}"}
+        worker.requests += 1
+        self.stats["calls"] += 1
+        if self._needs_recycling(worker):
+            # Recycle in the background so this caller gets its result now
+            threading.Thread(target=self._replace, args=(worker, "recycled"), daemon=True).start()
+        else:
+            self._checkin(worker)
+        if kind == "error":
+            return {"success": False, "error": value}
+        return value
+
+    async def call(self, args):
+        parent = current_span()
+        trace = (parent.trace_id, parent.span_id) if parent else (None, None)
+        return await run_blocking(self._call_blocking, args, trace)
+
+    def health_check(self):
+        """
+        Ping idle workers and replace any that are dead or unresponsive, then
+        start workers the pool lost to failed restarts.
+        """
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        healthy = 0
+        for worker in idle:
+            try:
+                if not worker.is_alive():
+                    raise WorkerCrashed("process exited")
+                kind, _ = worker.request(("ping",), timeout=PING_TIMEOUT)
+                if kind != "pong":
+                    raise WorkerCrashed(f"unexpected reply {kind}")
+            except WorkerCrashed:
+                self._replace(worker, "crashed")
+                continue
+            if self.max_memory and worker.rss > self.max_memory:
+                self._replace(worker, "recycled")
+                continue
+            healthy += 1
+            self._checkin(worker)
+        with self._idle_lock:
+            missing = self.size - len(self._workers) - self._starting
+        for _ in range(missing):
+            healthy += self._add_worker()
+        return healthy
+
+    def status(self):
+        with self._idle_lock:
+            return {
+                "workers": len(self._workers),
+                "idle": len(self._idle),
+                "rss_bytes": [worker.rss for worker in self._workers],
+                **self.stats,
+            }
+
+    def close(self):
+        with self._idle_lock:
+            workers, self._workers, self._idle = list(self._workers), set(), []
+        for worker in workers:
+            worker.stop()
+
+
+class WorkerManager:
+    """Keeps a warm WorkerPool for every tool in WORKER_TOOLS"""
+
+    def __init__(self, scripts_dir, tools=None, globals=None, **pool_options):
+        self.tools = WORKER_TOOLS if tools is None else tools
+        self.pools = {
+            name: WorkerPool(name, scripts_dir, workers=config.get("workers", 1),
+                             preload=config.get("preload", ()), globals=globals, **pool_options)
+            for name, config in self.tools.items()
+        }
+        self._health_task = None
+
+    def handles(self, tool_name):
+        return tool_name in self.pools
+
+    def start(self):
+        for pool in self.pools.values():
+            pool.start()
+
+    async def start_async(self):
+        await asyncio.gather(*[run_blocking(pool.start) for pool in self.pools.values()])
+
+    async def call(self, tool_name, args):
+        return await self.pools[tool_name].call(args)
+
+    def handler(self, tool_name):
+        """Async entry point with the same shape as a script's func"""
+        return functools.partial(self.call, tool_name)
+
+    def start_health_checks(self, interval=30):
+        async def check_forever():
+            while True:
+                await asyncio.sleep(interval)
+                for pool in self.pools.values():
+                    await run_blocking(pool.health_check)
+        self._health_task = asyncio.ensure_future(check_forever())
+
+    def status(self):
+        return {name: pool.status() for name, pool in self.pools.items()}
+
+    def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+        for pool in self.pools.values():
+            pool.close()
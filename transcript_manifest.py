@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+MANIFEST_PATH = Path(os.environ.get(
+    "SCRIPTY_TRANSCRIPT_MANIFEST", str(Path.home() / ".scripty" / "transcript_manifest.json")))
+HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on `path` shared with other processes saving the manifest"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TranscriptManifest:
+    """
+    Transcribed audio keyed by content hash, so a recording that was renamed,
+    moved or copied is recognised without uploading it again. Hashes are
+    remembered per (path, size, mtime) so unchanged files aren't re-read.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        data = _read(self.path)
+        self.transcripts = data.get("transcripts", {})
+        self.files = data.get("files", {})
+
+    def digest(self, path):
+        """Content hash of `path`, from the stat cache when the file is unchanged"""
+        path = str(Path(path).resolve())
+        stat = os.stat(path)
+        with self._lock:
+            known = self.files.get(path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+        digest = file_digest(path)
+        with self._lock:
+            self.files[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def get(self, digest):
+        with self._lock:
+            return self.transcripts.get(digest)
+
+    def record(self, digest, audio_path, transcript_file):
+        with self._lock:
+            self.transcripts[digest] = {
+                "audio_path": str(audio_path),
+                "transcript_file": str(transcript_file),
+                "transcribed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+
+    def save(self):
+        """
+        Write the manifest, merged with whatever other calls or processes have
+        saved since it was loaded, so concurrent transcriptions keep each
+        other's entries.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.path.with_name(self.path.name + ".lock")):
+            saved = _read(self.path)
+            with self._lock:
+                self.transcripts = {**saved.get("transcripts", {}), **self.transcripts}
+                # Forget hashes of files that have since been deleted or moved
+                self.files = {
+                    path: known for path, known in {**saved.get("files", {}), **self.files}.items()
+                    if os.path.exists(path)
+                }
+                data = {"transcripts": dict(self.transcripts), "files": dict(self.files)}
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent,
+                                             prefix=self.path.name + ".", suffix=".tmp", delete=False) as f:
+                json.dump(data, f, indent=1)
+            try:
+                os.replace(f.name, self.path)
+            except BaseException:
+                os.unlink(f.name)
+                raise
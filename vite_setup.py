@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -101,7 +104,7 @@ export default App"""
     with open(os.path.join(path, 'src', 'App.tsx'), 'w') as f:
         f.write(app_content)
 
-def setup_vite(folder_name="vite-react-app"):
+async def setup_vite(folder_name="vite-react-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -140,7 +143,7 @@ def setup_vite(folder_name="vite-react-app"):
         
         for cmd in commands:
             print(f"Running: {cmd}")  # Added logging
-            if not run_command(cmd, cwd=path if cmd == commands[0] else full_path):
+            if not await run_blocking(run_command, cmd, cwd=path if cmd == commands[0] else full_path):
                 print(f"Failed at command: {cmd}")  # Added logging
                 if os.path.exists(full_path):  # Cleanup on failure
                     try:
@@ -172,7 +175,7 @@ async def func(args):
         path = args.get("path", os.path.expanduser("~"))
         folder_name = args.get("folder_name", "vite_project")
         
-        if setup_vite(folder_name):
+        if await setup_vite(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"Vite + React project created successfully in {folder_name}"
@@ -4,7 +4,10 @@ import sys
 import json
 import tkinter as tk
 from tkinter import filedialog
+from tool_executor import run_blocking
+from tool_tracing import traced
 
+@traced("subprocess.run_command", capture=("command", "cwd"))
 def run_command(command, cwd=None):
     try:
         process = subprocess.Popen(
@@ -25,7 +28,7 @@ def run_command(command, cwd=None):
         print(f"Error executing command: {str(e)}")
         return False
 
-def setup_vue(folder_name="vue-ts-app"):
+async def setup_vue(folder_name="vue-ts-app"):
     try:
         # Create and configure root window with HiDPI support
         try:
@@ -64,7 +67,7 @@ def setup_vue(folder_name="vue-ts-app"):
         
         for cmd in commands:
             print(f"\nExecuting: {cmd}")
-            if not run_command(cmd, cwd=path if cmd == commands[0] else full_path):
+            if not await run_blocking(run_command, cmd, cwd=path if cmd == commands[0] else full_path):
                 return False
 
         tailwind_config = """/** @type {import('tailwindcss').Config} */
@@ -298,7 +301,7 @@ async def func(args):
         path = args.get("path", os.path.expanduser("~"))
         folder_name = args.get("folder_name", "vue_project")
         
-        if setup_vue(folder_name):
+        if await setup_vue(folder_name):
             return json.dumps({
                 "success": True,
                 "message": f"Vue.js project created successfully in {folder_name}"